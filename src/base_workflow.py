@@ -7,9 +7,15 @@ import uuid
 import logging
 import asyncio
 import functools
+from contextvars import ContextVar
 
 logger = logging.getLogger(__name__)
 
+# Stop event of the run being executed. run()/resume() set it around ainvoke, and the node
+# tasks LangGraph creates inherit it, so concurrent runs on one shared workflow instance
+# each see their own event rather than whichever caller started last
+_current_stop_event: ContextVar[Optional[asyncio.Event]] = ContextVar("current_stop_event", default=None)
+
 def check_cancellation(func):
     """Decorator to check for cancellation before async function execution
     This function will only abort the workflow before the function starts
@@ -17,13 +23,11 @@ def check_cancellation(func):
     """
     @functools.wraps(func)
     async def wrapper(*args, **kwargs):
-        # Extract stop_event from kwargs or get it from the first argument (self)
-        stop_event = kwargs.get('stop_event')
-        if stop_event is None and len(args) > 0 and hasattr(args[0], 'stop_event'):
-            stop_event = args[0].stop_event
+        # Extract stop_event from kwargs or fall back to the event of the current run
+        stop_event = kwargs.get('stop_event') or _current_stop_event.get()
             
-        if stop_event and stop_event.is_set():
-            logger.info(f"Function {func.__name__} was cancelled after completion")
+        if stop_event is not None and stop_event.is_set():
+            logger.info(f"Function {func.__name__} was cancelled before execution")
             raise asyncio.CancelledError()
         else:
             return await func(*args, **kwargs)
@@ -69,6 +73,11 @@ class BaseWorkflow(ABC):
         self._interrupt_configs = self._register_interrupt_configs()
         self._build_workflow()
     
+    @property
+    def stop_event(self) -> Optional[asyncio.Event]:
+        """Stop event of the run currently executing, for nodes that pass it on"""
+        return _current_stop_event.get()
+    
     # Remove @abstractmethod decorator and provide default implementation
     def _register_interrupt_configs(self) -> Dict[str, InterruptConfig]:
         """Register all interrupt configurations for this workflow
@@ -194,9 +203,14 @@ class BaseWorkflow(ABC):
             thread_id: Optional thread ID for the workflow
             stop_event: Optional asyncio.Event that can be set to cancel the workflow
         """
-        # Store stop_event as instance attribute so it can be accessed by workflow methods
-        self.stop_event = stop_event
-        
+        # Scope stop_event to this run so it can be accessed by workflow methods
+        token = _current_stop_event.set(stop_event)
+        try:
+            return await self._run(user_input, thread_id)
+        finally:
+            _current_stop_event.reset(token)
+    
+    async def _run(self, user_input: str, thread_id: Optional[str]) -> Dict[str, Any]:
         # Initialize state with user input
         initial_state = {"user_input": user_input}
         
@@ -286,7 +300,13 @@ class BaseWorkflow(ABC):
             thread_id: Thread ID for the workflow
             stop_event: Optional asyncio.Event that can be set to cancel the workflow
         """
-        self.stop_event = stop_event
+        token = _current_stop_event.set(stop_event)
+        try:
+            return await self._resume(user_input, thread_id)
+        finally:
+            _current_stop_event.reset(token)
+    
+    async def _resume(self, user_input: str, thread_id: str) -> Dict[str, Any]:
         # Handle special commands
         if user_input.lower() == "cancel":
             return {
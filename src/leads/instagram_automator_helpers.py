@@ -5,6 +5,7 @@ import numpy as np
 import json
 import hashlib
 import os
+import time
 from pathlib import Path
 from google.genai import types
 from google import genai
@@ -107,10 +108,36 @@ async def simulate_human_mouse_movement(page, target_x, target_y, current_mouse_
 
 
 # Typing functions
+_typing_rng = np.random.default_rng()
+
+# Characters followed by a longer pause to simulate thinking
+_PAUSE_CHARS = frozenset('.,! ?')
+
+
+def _typing_schedule(text, min_delay, max_delay):
+    """Precompute per-character keystroke delays for text.
+    
+    Args:
+        text: The text to be typed
+        min_delay: Minimum delay between keystrokes in seconds
+        max_delay: Maximum delay between keystrokes in seconds
+        
+    Returns:
+        np.ndarray: Delay in seconds after each character
+    """
+    delays = _typing_rng.uniform(min_delay, max_delay, len(text))
+    pauses = np.fromiter((char in _PAUSE_CHARS for char in text), dtype=bool, count=len(text))
+    delays[pauses] *= 1.5  # Longer pause after punctuation or spaces
+    return delays
+
+
 async def type_humanlike(page, element, text, min_delay=0.02, max_delay=0.1, logger=None):
     """
     Type text into an element with human-like timing variations.
     
+    Characters are typed in short bursts of 3-5 with one combined pause per
+    burst, drawn from a precomputed delay schedule.
+    
     Args:
         page: Playwright page object
         element: The Playwright element to type into
@@ -125,19 +152,15 @@ async def type_humanlike(page, element, text, min_delay=0.02, max_delay=0.1, log
     # Focus on the element
     await element.focus()
     
-    # Type each character with a random delay
-    for char in text:
-        # Type the character
-        await page.keyboard.type(char)
-        
-        # Add a random delay between keystrokes
-        typing_delay = random.uniform(min_delay, max_delay)
-        
-        # Add slightly longer delays for certain characters to simulate thinking
-        if char in ['.', ',', '!', '?', ' ']:
-            typing_delay *= 1.5  # Longer pause after punctuation or spaces
-        
-        await asyncio.sleep(typing_delay)
+    delays = _typing_schedule(text, min_delay, max_delay)
+    
+    # Type the text in short bursts, pausing for the burst's combined delay
+    i = 0
+    while i < len(text):
+        burst = random.randint(3, 5)
+        await page.keyboard.type(text[i:i + burst])
+        await asyncio.sleep(float(delays[i:i + burst].sum()))
+        i += burst
     
     # Log the typing action
     if logger:
@@ -200,6 +223,35 @@ def get_screenshot_hash(screenshot_path):
     with open(screenshot_path, 'rb') as f:
         return hashlib.md5(f.read()).hexdigest()
 
+def load_cached_profile_analysis(url_hash, ttl_seconds):
+    """Load a cached profile analysis if it exists and is younger than ttl_seconds.
+    
+    Args:
+        url_hash: Hash of the profile URL used as cache key
+        ttl_seconds: Maximum age of the cache entry in seconds
+        
+    Returns:
+        dict or None: The cached analysis, or None on a miss
+    """
+    cache_file = CACHE_DIR / f"{url_hash}.analysis.json"
+    try:
+        if time.time() - cache_file.stat().st_mtime > ttl_seconds:
+            return None
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def save_profile_analysis(url_hash, analysis_result):
+    """Cache a profile analysis under the profile URL hash."""
+    # Only cache complete analyses, not the error fallback
+    if "account_type" not in analysis_result:
+        return
+    cache_file = CACHE_DIR / f"{url_hash}.analysis.json"
+    with open(cache_file, 'w', encoding='utf-8') as f:
+        json.dump(analysis_result, f, indent=2)
+
     # Add this model definition after the imports (around line 20)
 class InstagramProfileAnalysis(BaseModel):
     """Simple model for Instagram profile analysis"""
@@ -330,14 +382,16 @@ async def analyze_instagram_screenshot(screenshot_path, logger=None):
             "main_topics": []
         }
 
-async def generate_personalized_message(analysis_result, logger=None):
+async def generate_personalized_message(analysis_result, logger=None, use_cache=False, url_hash=None, ttl_seconds=None):
     """
     Generate a personalized Instagram message based on screenshot analysis.
     
     Args:
         analysis_result: Result from analyze_instagram_screenshot (InstagramProfileAnalysis)
-        profile_url: Optional profile URL for context
         logger: Optional logger instance
+        use_cache: Reuse a message previously generated for the same profile and prompt
+        url_hash: Key of the profile being messaged; messages are only cached per profile
+        ttl_seconds: Maximum age of a cached message in seconds, no limit if None
         
     Returns:
         str: Generated personalized message
@@ -360,6 +414,20 @@ async def generate_personalized_message(analysis_result, logger=None):
     # Create message generation prompt
     message_prompt = message_template
     
+    # Key the cache on the profile and the full prompt, so accounts with the same niche never
+    # share a message and template edits invalidate it
+    use_cache = use_cache and url_hash is not None
+    if use_cache:
+        prompt_hash = hashlib.sha1(message_prompt.encode('utf-8')).hexdigest()[:16]
+        cache_file = CACHE_DIR / f"{url_hash}_{prompt_hash}_message.txt"
+        try:
+            if ttl_seconds is None or time.time() - cache_file.stat().st_mtime <= ttl_seconds:
+                if logger:
+                    logger.info("Using cached personalized message")
+                return cache_file.read_text(encoding='utf-8')
+        except FileNotFoundError:
+            pass
+    
     response = get_client().models.generate_content(
         model='gemini-2.0-flash',
         contents=[message_prompt]
@@ -367,6 +435,9 @@ async def generate_personalized_message(analysis_result, logger=None):
     
     generated_message = response.text.strip()
     
+    if use_cache:
+        cache_file.write_text(generated_message, encoding='utf-8')
+    
     if logger:
         logger.info(f"Generated personalized message: {generated_message[:50]}...")
     
@@ -9,6 +9,8 @@ from pathlib import Path
 import random
 import tempfile
 from typing import TypedDict, Optional
+import httpx
+import orjson
 from ..base_workflow import BaseWorkflow, BaseWorkflowState
 from langgraph.graph import END
 
@@ -16,6 +18,15 @@ from langgraph.graph import END
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Google Custom Search JSON API endpoint
+CSE_ENDPOINT = "https://www.googleapis.com/customsearch/v1"
+
+# Instagram paths that are not user handles and should be skipped
+_SKIP_HANDLES = frozenset({
+    "instagram", "explore", "p", "reel", "accounts",
+    "about", "developer", "directory", "web"
+})
+
 class InstagramCollaborationState(BaseWorkflowState):
     """State for Instagram collaboration workflow"""
     user_input: str  # User input from BaseWorkflowState
@@ -49,6 +60,11 @@ class InstagramCollaborationFinder:
         # Create output directory if it doesn't exist
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
+        # Compute filename parts once so raw and final CSVs share a timestamp
+        self._niche_slug = (niche or "all").replace(" ", "_")
+        self._ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self._raw_csv_path = self.output_dir / f"{self._niche_slug}_raw_search_results_{self._ts}.csv"
+        
         # User agent to mimic browser
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
@@ -65,9 +81,9 @@ class InstagramCollaborationFinder:
             list: List of search queries
         """
         queries = [
-            # Brand-focused queries with niche and location
-            f"site:instagram.com \"{self.niche}\" \"www.\" \"{self.location}\" -inurl:/reel/ -inurl:/p/",
-            f"site:instagram.com \"official account\" \"{self.niche}\" \"{self.location}\" -inurl:/reel/ -inurl:/p/",
+            # Brand-focused query with niche and location; the OR group covers both
+            # the website and "official account" variants in a single paginated search
+            f"site:instagram.com (\"www.\" OR \"official account\") \"{self.niche}\" \"{self.location}\" -inurl:/reel/ -inurl:/p/",
         ]
         
         return queries
@@ -85,16 +101,12 @@ class InstagramCollaborationFinder:
             list: List of search result dictionaries
         """
         try:
-            # Get the search client from gemini_client.py
-            from src.utils.gemini_client import get_search_client
-            
-            search_service = get_search_client()
-            if search_service is None:
-                logger.error("Error: Search service not initialized properly.")
-                return []
-            
-            # Get the Custom Search Engine ID
+            # Get the API key and Custom Search Engine ID
+            api_key = os.getenv('GOOGLE_API_KEY')
             cse_id = os.getenv('GOOGLE_CSE_ID')
+            if not api_key or not cse_id:
+                logger.error("Error: GOOGLE_API_KEY or GOOGLE_CSE_ID not configured.")
+                return []
                         
             logger.info(f"Searching Google for: {query}")
             
@@ -103,50 +115,54 @@ class InstagramCollaborationFinder:
             # Fetch multiple pages of results (maximum 10 pages)
             actual_max_pages = min(max_pages, 10)  # Ensure we don't exceed 10 pages
             
-            for page in range(actual_max_pages):
-                start_index = (page * num_results) + 1  # Google's API uses 1-based indexing
-                
-                logger.info(f"Fetching page {page+1}/{actual_max_pages} with start_index {start_index}")
-                
-                # Execute the search query for this page
-                res = search_service.cse().list(
-                    q=query,
-                    cx=cse_id,
-                    num=num_results,
-                    start=start_index
-                ).execute()
-                
-                # Check if there are any search results
-                if 'items' not in res:
-                    logger.warning(f"No results found for page {page+1}")
-                    break  # No more results available
-                
-                # Format the results for this page
-                for item in res['items']:
-                    result = {
-                        "title": item.get("title", ""),
-                        "link": item.get("link", ""),
-                        "snippet": item.get("snippet", "")
-                    }
-                    all_results.append(result)
-                
-                # If we got fewer results than requested, there are no more pages
-                if len(res.get('items', [])) < num_results:
-                    logger.info(f"Received fewer results than requested, stopping pagination")
-                    break
-                
-                # Add a delay between requests to avoid rate limiting
-                if page < actual_max_pages - 1:
-                    sleep_time = random.uniform(2.0, 5.0)  # Random sleep between 2-5 seconds
-                    logger.info(f"Sleeping for {sleep_time:.2f} seconds before next request")
-                    await asyncio.sleep(sleep_time)
+            # Reuse one client so every page goes over the same keep-alive connection
+            async with httpx.AsyncClient(timeout=15.0) as client:
+                for page in range(actual_max_pages):
+                    start_index = (page * num_results) + 1  # Google's API uses 1-based indexing
+                    
+                    logger.info(f"Fetching page {page+1}/{actual_max_pages} with start_index {start_index}")
+                    
+                    # Execute the search query for this page
+                    response = await client.get(CSE_ENDPOINT, params={
+                        "key": api_key,
+                        "cx": cse_id,
+                        "q": query,
+                        "num": num_results,
+                        "start": start_index
+                    })
+                    response.raise_for_status()
+                    res = orjson.loads(response.content)
+                    
+                    # Check if there are any search results
+                    items = res.get('items')
+                    if not items:
+                        logger.warning(f"No results found for page {page+1}")
+                        break  # No more results available
+                    
+                    # Format the results for this page
+                    for item in items:
+                        result = {
+                            "title": item.get("title", ""),
+                            "link": item.get("link", ""),
+                            "snippet": item.get("snippet", "")
+                        }
+                        all_results.append(result)
+                    
+                    # If we got fewer results than requested, there are no more pages
+                    if len(items) < num_results:
+                        logger.info(f"Received fewer results than requested, stopping pagination")
+                        break
+                    
+                    # Add a delay between requests to avoid rate limiting
+                    if page < actual_max_pages - 1:
+                        sleep_time = random.uniform(2.0, 5.0)  # Random sleep between 2-5 seconds
+                        logger.info(f"Sleeping for {sleep_time:.2f} seconds before next request")
+                        await asyncio.sleep(sleep_time)
             
             logger.info(f"Total results found: {len(all_results)}")
             
             # Save raw search results to CSV
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            raw_csv_filename = f"{self.niche}_raw_search_results_{timestamp}.csv"
-            raw_csv_path = self.output_dir / raw_csv_filename
+            raw_csv_path = self._raw_csv_path
             
             with open(raw_csv_path, 'w', newline='', encoding='utf-8') as csvfile:
                 fieldnames = ["title", "link", "snippet"]
@@ -187,8 +203,8 @@ class InstagramCollaborationFinder:
             
             if matches:
                 for handle in matches:
-                    # Skip Instagram's own handle
-                    if handle in ["instagram", "explore", "p"]:
+                    # Skip Instagram's own handle and non-profile paths
+                    if handle.lower() in _SKIP_HANDLES:
                         continue
                         
                     # Create opportunity dictionary
@@ -275,12 +291,8 @@ class InstagramCollaborationFinder:
             logger.warning("No opportunities to save")
             return None
         
-        # Create timestamp for filename
-        timestamp = datetime.now().strftime("%Y%m%d")
-        
-        # Create filename with niche
-        niche_str = self.niche.replace(" ", "_") if self.niche else "all"
-        filename = f"{niche_str}_leads_{timestamp}.csv"
+        # Create filename with niche and the finder's timestamp
+        filename = f"{self._niche_slug}_leads_{self._ts}.csv"
         
         # Full path to CSV file
         csv_path = self.output_dir / filename
@@ -1,27 +1,27 @@
 from typing import TypedDict, Optional, Dict, Any
 from pydantic import Field
-import csv
 import shutil
 import asyncio
+import base64
 import logging
 import os
 import re
+import sys
 import tempfile
 if os.name == 'nt':  # 'nt' indicates Windows
     import winreg
 from pathlib import Path
 from src.utils.env_loader import load_environment
-from datetime import datetime
+import time
 from src.utils.db_client import get_db_context
 from src.utils.config_loader import get_config
+from src.utils.resource_path import is_docker
 
 # Use only load_environment()
 load_environment()
-from playwright.async_api import async_playwright
 from src.base_workflow import BaseWorkflow, BaseWorkflowState, InterruptConfig, check_cancellation
 from langgraph.graph import END
 import hashlib
-import yaml
 from src.leads.instagram_automator_helpers import CACHE_DIR
 CACHE_DIR.mkdir(exist_ok=True)
 
@@ -29,7 +29,8 @@ CACHE_DIR.mkdir(exist_ok=True)
 from src.leads.instagram_automator_helpers import (
     add_random_delays, add_delay, simulate_human_mouse_movement,
      type_humanlike, analyze_instagram_screenshot,
-    generate_personalized_message
+    generate_personalized_message, load_cached_profile_analysis,
+    save_profile_analysis
 )
 
 
@@ -37,13 +38,243 @@ from src.leads.instagram_automator_helpers import (
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+IS_DOCKER = is_docker()
+
+# Instagram session cookies and local storage, persisted as a small JSON file
+IG_STATE_JSON = str(Path.home() / ".playwright-instagram-state.json")
+# Full Chrome profile used by earlier versions; migrated to IG_STATE_JSON once
+LEGACY_USER_DATA_DIR = str(Path.home() / ".playwright-instagram-data")
+
+# Chrome flags for the shared browser and options for each workflow's context
+CHROME_ARGS = [
+    '--no-sandbox',
+    '--disable-setuid-sandbox',
+    '--disable-infobars',
+    '--disable-dev-shm-usage',
+    '--disable-accelerated-2d-canvas',
+    '--no-first-run',
+    '--no-zygote',
+    '--disable-gpu',
+    '--hide-scrollbars',
+    '--mute-audio',
+    # Skip background work Chrome does at startup that the automation never needs
+    '--disable-extensions',
+    '--disable-component-update',
+    '--disable-background-networking'
+]
+CONTEXT_OPTIONS = dict(
+    viewport={'width': 600, 'height': 900},
+    user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36',
+    locale='en-US',
+    timezone_id='America/New_York',
+    color_scheme='light',
+    device_scale_factor=0.3,
+    is_mobile=False
+)
+
+# Playwright driver and Chrome browser shared by all workflow runs, as a
+# (playwright, browser) tuple. Each run opens its own context on the browser.
+_shared_browser = None
+_shared_browser_lock = asyncio.Lock()
+
+def find_chrome_path():
+    """Locate the installed Google Chrome executable, or return None"""
+    # Try environment PATH
+    chrome = shutil.which("chrome") or shutil.which("chrome.exe") or shutil.which("Google Chrome")
+    if chrome:
+        return chrome
+
+    # Check platform-specific locations
+    if sys.platform == 'darwin':  # macOS
+        mac_candidates = [
+            "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+            "~/Applications/Google Chrome.app/Contents/MacOS/Google Chrome"
+        ]
+        for path in mac_candidates:
+            expanded_path = os.path.expanduser(path)
+            if os.path.exists(expanded_path):
+                return expanded_path
+                
+    elif os.name == 'nt':  # Windows
+        win_candidates = [
+            Path("C:/Program Files/Google/Chrome/Application/chrome.exe"),
+            Path("C:/Program Files (x86)/Google/Chrome/Application/chrome.exe")
+        ]
+        for path in win_candidates:
+            if path.exists():
+                return str(path)
+
+    return None
+
+async def _migrate_user_data_dir(playwright, launch_options):
+    """Export the session from the legacy persistent profile to IG_STATE_JSON, then delete the profile"""
+    try:
+        legacy = await playwright.chromium.launch_persistent_context(
+            user_data_dir=LEGACY_USER_DATA_DIR, **launch_options, **CONTEXT_OPTIONS
+        )
+        try:
+            await legacy.storage_state(path=IG_STATE_JSON)
+        finally:
+            await legacy.close()
+        shutil.rmtree(LEGACY_USER_DATA_DIR, ignore_errors=True)
+        logger.info(f"Migrated Instagram session from {LEGACY_USER_DATA_DIR} to {IG_STATE_JSON}")
+    except Exception as e:
+        # Keep the old profile; the user will just be asked to log in again
+        logger.error(f"Error migrating legacy browser profile: {str(e)}")
+
+async def _launch_shared_browser(headless):
+    """Start Playwright and launch the installed Chrome"""
+    chrome_exe = find_chrome_path()
+    if not chrome_exe:
+        raise RuntimeError("System Chrome not found on this machine.")
+    
+    print(f"✅ Using system Chrome at: {chrome_exe}")
+
+    # Imported here so the module loads without starting Playwright's driver code
+    from playwright.async_api import async_playwright
+    playwright = await async_playwright().start()
+    launch_options = dict(
+        headless=headless,
+        channel="chrome",  # Use installed Chrome browser instead of Chromium
+        args=CHROME_ARGS,
+        chromium_sandbox=False
+    )
+    try:
+        if not os.path.exists(IG_STATE_JSON) and os.path.isdir(LEGACY_USER_DATA_DIR):
+            await _migrate_user_data_dir(playwright, launch_options)
+        browser = await playwright.chromium.launch(**launch_options)
+    except Exception:
+        await playwright.stop()
+        raise
+    logger.info("Using installed Chrome browser with channel parameter")
+    return playwright, browser
+
+async def get_shared_browser(headless=False):
+    """Return the shared (playwright, browser), launching Chrome on first use or after it was closed"""
+    global _shared_browser
+    async with _shared_browser_lock:
+        if _shared_browser is not None and not _shared_browser[1].is_connected():
+            # The user closed the browser window; discard the dead driver
+            try:
+                await _shared_browser[0].stop()
+            except Exception as e:
+                logger.error(f"Error stopping Playwright: {str(e)}")
+            _shared_browser = None
+        if _shared_browser is None:
+            _shared_browser = await _launch_shared_browser(headless)
+        return _shared_browser
+
+async def close_shared_browser():
+    """Close the shared browser and stop its Playwright instance"""
+    global _shared_browser
+    async with _shared_browser_lock:
+        if _shared_browser is None:
+            return
+        playwright, browser = _shared_browser
+        _shared_browser = None
+        try:
+            # Save the session of every open context first, so a run still waiting for
+            # confirmation keeps its login across a shutdown
+            for context in browser.contexts:
+                try:
+                    await context.storage_state(path=IG_STATE_JSON)
+                except Exception as e:
+                    logger.error(f"Error saving browser storage state: {str(e)}")
+            await browser.close()
+        except Exception as e:
+            logger.error(f"Error closing shared browser: {str(e)}")
+        finally:
+            await playwright.stop()
+
+# DOM selectors for the profile "Message" button and the DM input, most specific first
+MESSAGE_BUTTON_SELECTORS = (
+    "div[role='button'][tabindex='0']:has-text('Message')",
+    "button:has-text('Message')",
+    "a[role='button']:has-text('Message')",
+)
+MESSAGE_INPUT_SELECTORS = (
+    "div[contenteditable='true'][aria-label*='Message']",
+    "input[placeholder*='Message']",
+)
+# Generic inputs that can also match a search box or comment field; tried only when
+# none of the specific input selectors match
+MESSAGE_INPUT_FALLBACK_SELECTORS = (
+    "[role='textbox']",
+    "[contenteditable='true']",
+)
+
+async def _find_visible(page, selectors, timeout):
+    """Return the first visible element of the highest-priority selector that has one.
+    
+    One bounded wait covers all selectors at once; the match is then picked in priority
+    order rather than DOM order. Returns (selector, element), or (None, None) on timeout.
+    """
+    visible = [f"{selector}:visible" for selector in selectors]
+    try:
+        await page.locator(", ".join(visible)).first.wait_for(state="visible", timeout=timeout)
+    except Exception:
+        return None, None
+    for selector, visible_selector in zip(selectors, visible):
+        locator = page.locator(visible_selector)
+        if await locator.count():
+            return selector, await locator.first.element_handle()
+    return None, None
+
+# Viewport region holding the profile header (bio, category, action buttons)
+PROFILE_HEADER_CLIP = {"x": 0, "y": 0, "width": 600, "height": 400}
+
+# State keys written by analyze_profile that a prefetched analysis carries over
+PREFETCH_STATE_KEYS = ("current_profile_url", "message_text", "analysis_result")
+
+# Upcoming profiles analyzed in the background while a message awaits confirmation;
+# also bounds how many prefetch pages are open at once
+PREFETCH_DEPTH = 3
+
+# pandas is imported on first use so loading this module stays cheap
+_pandas = None
+
+def _pd():
+    """Return the pandas module, importing it on first use"""
+    global _pandas
+    if _pandas is None:
+        import pandas
+        _pandas = pandas
+    return _pandas
+
+# Column dtypes for profile CSVs, so pandas can skip type inference
+PROFILE_CSV_DTYPES = {'profile_url': 'string', 'skip': 'string'}
+
+def _profile_column(column):
+    """Only parse the columns the messaging workflow reads; lead CSVs carry many more"""
+    return column in PROFILE_CSV_DTYPES
+
+def _extract_username(profile_url):
+    """Return the last path segment of a profile URL, ignoring a trailing slash"""
+    return profile_url.rstrip('/').rpartition('/')[2]
+
+# Normalized confirmation replies mapped to their meaning
+_LOGIN_REPLIES = {
+    "yes": True, "y": True, "yes, i've logged in": True,
+    "no": False, "n": False, "cancel": False,
+}
+_MESSAGE_REPLIES = {
+    "yes": "send", "y": "send", "send": "send", "send message": "send",
+    "no": "skip", "n": "skip", "skip": "skip", "skip this profile": "skip",
+    "cancel": "cancel", "end": "cancel", "quit": "cancel", "exit": "cancel",
+}
+
+# Next node for each message confirmation action; edited messages loop back for confirmation
+_CONFIRMATION_ROUTES = {
+    "cancel": "cancel_workflow",
+    "send": "prepare_message",
+    "edit": "message_confirmation",
+}
+
 def validate_login_confirmation(user_input: str, context: Dict) -> Dict[str, Any]:
     """Validate login confirmation input"""
-    if user_input.lower() in ["yes", "y", "yes, i've logged in"]:
-        return {"valid": True, "confirmed": True}
-    elif user_input.lower() in ["no", "n", "cancel"]:
-        return {"valid": True, "confirmed": False}
-    else:
+    try:
+        return {"valid": True, "confirmed": _LOGIN_REPLIES[user_input.strip().lower()]}
+    except KeyError:
         return {
             "valid": False,
             "error_message": "Please confirm with 'Yes' or cancel with 'No'"
@@ -56,13 +287,14 @@ class InstagramMessageState(BaseWorkflowState):
     delay: Optional[int]  # Delay between messages
     max_profiles: Optional[int]  # Maximum profiles to message
     automation_result: Optional[dict]  # Result from automation
-    screenshot_path: Optional[str]  # Screenshot path
+    screenshot_bytes: Optional[bytes]  # Latest JPEG screenshot for the confirmation UI
+    screenshot_path: Optional[str]  # Optional path to also write screenshots to (legacy)
     current_profile_url: Optional[str]  # Current profile being processed
     message_text: Optional[str]  # Message to be sent
-    message_confirmed: Optional[bool] = None  # Confirmation status for message
-    message_sent: Optional[bool] = None  # Sent status for message
-    processed: int = 0  # Number of profiles processed
-    successful: int = 0  # Number of profiles successfully messaged
+    message_confirmed: Optional[str]  # Confirmation action for message (send/skip/edit/cancel)
+    message_sent: Optional[bool]  # Sent status for message
+    processed: int  # Number of profiles processed (read with .get(..., 0))
+    successful: int  # Number of profiles successfully messaged (read with .get(..., 0))
 
 class InstagramMessageAutomator:
     def __init__(self, csv_path, headless=False, workflow_instance=None):
@@ -83,86 +315,62 @@ class InstagramMessageAutomator:
         self.current_mouse_x = 0
         self.current_mouse_y = 0
         self.workflow = workflow_instance  # Store workflow reference
+        self.messaged_profiles = set()  # Profile URLs and usernames already messaged
         
-    async def setup(self, playwright):
-        """Set up the Playwright browser instance with a persistent context."""
+    async def setup(self):
+        """Open a browser context on the shared Chrome, restored from the saved session."""
         if IS_DOCKER:
             self.logger.info("Skipping Playwright setup in Docker environment")
             return
-        # Use the provided playwright instance
-        self.playwright = playwright
-        
-        # Use a persistent context to maintain cookies and session data
-        user_data_dir = Path.home() / ".playwright-instagram-data"
-
-        def find_chrome_path():
-                # Try environment PATH
-                chrome = shutil.which("chrome") or shutil.which("chrome.exe") or shutil.which("Google Chrome")
-                if chrome:
-                    return chrome
-
-                # Check platform-specific locations
-                if sys.platform == 'darwin':  # macOS
-                    mac_candidates = [
-                        "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
-                        "~/Applications/Google Chrome.app/Contents/MacOS/Google Chrome"
-                    ]
-                    for path in mac_candidates:
-                        expanded_path = os.path.expanduser(path)
-                        if os.path.exists(expanded_path):
-                            return expanded_path
-                            
-                elif os.name == 'nt':  # Windows
-                    win_candidates = [
-                        Path("C:/Program Files/Google/Chrome/Application/chrome.exe"),
-                        Path("C:/Program Files (x86)/Google/Chrome/Application/chrome.exe")
-                    ]
-                    for path in win_candidates:
-                        if path.exists():
-                            return str(path)
-
-                return None
-
-        chrome_exe = find_chrome_path()
-        if not chrome_exe:
-            raise RuntimeError("System Chrome not found on this machine.")
-        
-        print(f"✅ Using system Chrome at: {chrome_exe}")
-
-        self.browser = await self.playwright.chromium.launch_persistent_context(
-            user_data_dir=str(user_data_dir),
-            headless=self.headless,
-            channel="chrome",  # Use installed Chrome browser instead of Chromium
-            args=[
-                '--no-sandbox',
-                '--disable-setuid-sandbox',
-                '--disable-infobars',
-                '--disable-dev-shm-usage',
-                '--disable-accelerated-2d-canvas',
-                '--no-first-run',
-                '--no-zygote',
-                '--disable-gpu',
-                '--hide-scrollbars',
-                '--mute-audio'
-            ],
-            viewport={'width': 600, 'height': 900},
-            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36',
-            locale='en-US',
-            timezone_id='America/New_York',
-            color_scheme='light',
-            device_scale_factor=0.3,
-            is_mobile=False
+        
+        self.playwright, chrome = await get_shared_browser(self.headless)
+        # Without a saved state the context starts logged out and the user logs in manually
+        self.browser = await chrome.new_context(
+            storage_state=IG_STATE_JSON if os.path.exists(IG_STATE_JSON) else None,
+            **CONTEXT_OPTIONS
         )
-        logging.info("Using installed Chrome browser with channel parameter")
+        self.page = await self.new_page()
+        
+    async def save_storage_state(self):
+        """Persist the current session cookies so the next launch starts logged in."""
+        if self.browser:
+            try:
+                await self.browser.storage_state(path=IG_STATE_JSON)
+            except Exception as e:
+                self.logger.error(f"Error saving browser storage state: {str(e)}")
+        
+    async def close(self):
+        """Save the session and close this automator's context; the shared browser keeps running."""
+        if self.browser:
+            await self.save_storage_state()
+            try:
+                await self.browser.close()
+            except Exception as e:
+                self.logger.error(f"Error closing browser context: {str(e)}")
+        self.browser = None
+        self.page = None
         
-        self.page = await self.browser.new_page()
+    async def new_page(self):
+        """Open a new page in the browser context with the standard request headers."""
+        page = await self.browser.new_page()
         
         # Add additional headers
-        await self.page.set_extra_http_headers({
+        await page.set_extra_http_headers({
             'Accept-Language': 'en-US,en;q=0.9',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
             'Accept-Encoding': 'gzip, deflate, br'
         })
+        return page
+        
+    async def capture_screenshot(self, state, page=None):
+        """Screenshot the page into state["screenshot_bytes"], writing to screenshot_path only if one is set."""
+        page = page or self.page
+        # JPEG encodes much faster than PNG and the bytes never touch disk
+        state["screenshot_bytes"] = await page.screenshot(type="jpeg", quality=70)
+        if state.get("screenshot_path"):
+            with open(state["screenshot_path"], "wb") as f:
+                f.write(state["screenshot_bytes"])
+        return state
         
     async def login(self, state):
         """Log in to Instagram manually with user interaction via LangGraph interrupt."""
@@ -171,7 +379,7 @@ class InstagramMessageAutomator:
             await self.page.goto("https://www.instagram.com/accounts/login/")
             
             # Take a screenshot for the UI
-            await self.page.screenshot(path=state["screenshot_path"])
+            await self.capture_screenshot(state)
             
             self.logger.info("Please log in to Instagram manually in the browser window.")
             
@@ -184,14 +392,24 @@ class InstagramMessageAutomator:
             state["workflow_status"] = "error"
             return state
             
-    def load_profiles(self):
-        """Load Instagram profiles from the CSV file."""
+    def load_profiles(self, df=None):
+        """Load Instagram profiles from the CSV file.
+        
+        Args:
+            df: Optional DataFrame already parsed from the CSV, to avoid reading it again
+        """
         try:
-            with open(self.csv_path, 'r', encoding='utf-8') as csvfile:
-                reader = csv.DictReader(csvfile)
-                # Filter out profiles that have skip=true or skip=True
-                self.profiles = [row for row in reader if row.get('profile_url') and 
-                                not (row.get('skip') == 'true' or row.get('skip') == 'True' or row.get('skip') is True)]
+            if df is None:
+                df = _pd().read_csv(self.csv_path, engine="c", usecols=_profile_column, dtype=PROFILE_CSV_DTYPES)
+            
+            # Filter out rows without a profile URL or with skip=true (any case)
+            mask = df['profile_url'].notna()
+            if 'skip' in df.columns:
+                mask &= ~df['skip'].astype('string').fillna('').str.lower().eq('true')
+            self.profiles = df[mask].to_dict('records')
+            # Derive usernames once here rather than on every messaged-profile check
+            for profile in self.profiles:
+                profile['username'] = _extract_username(profile['profile_url'])
                 
             self.logger.info(f"Loaded {len(self.profiles)} profiles from {self.csv_path}")
             return True
@@ -200,31 +418,66 @@ class InstagramMessageAutomator:
             self.logger.error(f"Failed to load profiles from CSV: {str(e)}")
             return False
             
-    async def analyze_profile(self, profile_url, state):
-        """Analyze an Instagram profile and determine if it's suitable for messaging."""
+    def drop_messaged_profiles(self):
+        """Remove profiles already in messaged_profiles so the processing loop never visits them."""
+        before = len(self.profiles)
+        self.profiles = [
+            profile for profile in self.profiles
+            if not check_if_profile_messaged(profile['profile_url'], self.messaged_profiles, profile['username'])
+        ]
+        if before != len(self.profiles):
+            self.logger.info(f"Skipping {before - len(self.profiles)} profiles that have been messaged before")
+        
+    async def analyze_profile(self, profile_url, state, page=None, username=None):
+        """Analyze an Instagram profile and determine if it's suitable for messaging.
+        
+        Args:
+            profile_url (str): URL of the profile to analyze
+            state (dict): Workflow state to update with the analysis
+            page: Optional Playwright page to use instead of self.page
+            username (str): Optional username precomputed by load_profiles
+        """
+        page = page or self.page
         try:
             # Check if this profile has been messaged before
-            already_messaged = await check_if_profile_messaged(profile_url)
-            if already_messaged:
+            if check_if_profile_messaged(profile_url, self.messaged_profiles, username):
                 self.logger.info(f"Skipping {profile_url} as it has been messaged before")
                 state["current_profile_url"] = None
                 return False, state
                 
-            # Navigate to the profile
-            await self.page.goto(profile_url)
-            await add_random_delays(1, 3, self.logger)
+            # Create a URL-based key for the screenshot and analysis cache
+            url_hash = hashlib.blake2b(profile_url.encode(), digest_size=8).hexdigest()
+            
+            instagram_config = get_config().get('instagram_message_workflow', {})
+            use_cache = instagram_config.get('use_analysis_cache', True)
+            cache_ttl = instagram_config.get('analysis_cache_ttl_hours', 24) * 3600
+            
+            # Reuse a recent analysis of this profile if one is cached
+            analysis_result = None
+            if use_cache:
+                analysis_result = load_cached_profile_analysis(url_hash, cache_ttl)
+            if analysis_result is not None:
+                self.logger.info(f"Using cached analysis for {profile_url}")
+            
+            # Personal accounts from the cache can be skipped without navigating
+            if analysis_result is None or analysis_result.get("account_type", "").lower() != "personal":
+                # Navigate to the profile
+                await page.goto(profile_url)
+                await add_random_delays(1, 3, self.logger)
             
             # Store current profile URL in state
             state["current_profile_url"] = profile_url
             
-            # Create a URL-based filename for the screenshot
-            url_hash = hashlib.md5(profile_url.encode()).hexdigest()
-            screenshot_path = os.path.join(CACHE_DIR, f"{url_hash}_screenshot.png")
-            
-            await self.page.screenshot(path=screenshot_path)
+            if analysis_result is None:
+                screenshot_path = os.path.join(CACHE_DIR, f"{url_hash}_screenshot.jpg")
+                
+                # Only the profile header is needed for the analysis
+                await page.screenshot(path=screenshot_path, clip=PROFILE_HEADER_CLIP, type="jpeg", quality=75)
 
-            # Step 1: Analyze screenshot
-            analysis_result = await analyze_instagram_screenshot(screenshot_path, self.logger)
+                # Step 1: Analyze screenshot
+                analysis_result = await analyze_instagram_screenshot(screenshot_path, self.logger)
+                if use_cache:
+                    save_profile_analysis(url_hash, analysis_result)
             
             # Check if this is a personal account and skip if it is
             if analysis_result.get("account_type", "").lower() == "personal":
@@ -233,7 +486,9 @@ class InstagramMessageAutomator:
                 return False, state
                 
             # Step 2: Generate personalized message only for brand accounts
-            personalized_message = await generate_personalized_message(analysis_result, self.logger)
+            personalized_message = await generate_personalized_message(
+                analysis_result, self.logger, use_cache, url_hash=url_hash, ttl_seconds=cache_ttl
+            )
             
             # Store the generated message in state
             state["message_text"] = personalized_message
@@ -245,8 +500,9 @@ class InstagramMessageAutomator:
             self.logger.error(f"Error in analyze_profile: {str(e)}")
             return False, state
     
-    async def prepare_and_type_message(self, state):
+    async def prepare_and_type_message(self, state, page=None):
         """Find message button and type the personalized message."""
+        page = page or self.page
         try:
             if not state.get("message_text") or not state.get("current_profile_url"):
                 self.logger.error("Missing required state information for messaging")
@@ -254,23 +510,14 @@ class InstagramMessageAutomator:
                 
             personalized_message = state["message_text"]
             
-            # Try DOM-based approach first
-            selectors = [
-                "div[role='button'][tabindex='0']:has-text('Message')",
-                "button:has-text('Message')",
-                "a[role='button']:has-text('Message')",
-            ]
-            
+            # Try DOM-based approach first, taking the button selectors in priority order
             message_button = None
-            for selector in selectors:
-                try:
-                    message_button = await self.page.query_selector(selector)
-                    if message_button:
-                        break
-                except Exception:
-                    continue
+            try:
+                _, message_button = await _find_visible(page, MESSAGE_BUTTON_SELECTORS, 5000)
+            except Exception as e:
+                self.logger.info(f"Message button selectors failed: {str(e)}")
             
-            # If DOM-based approach fails, try vision-based approach
+            # There is no visual fallback; without a DOM match the profile is skipped
             if not message_button:
                 self.logger.error("Could not find message button using either method")
                 return False, state
@@ -283,31 +530,22 @@ class InstagramMessageAutomator:
                     
                     # Use helper function directly
                     self.current_mouse_x, self.current_mouse_y = await simulate_human_mouse_movement(
-                        self.page, target_x, target_y, self.current_mouse_x, self.current_mouse_y
+                        page, target_x, target_y, self.current_mouse_x, self.current_mouse_y
                     )
-                    await self.page.mouse.click(target_x, target_y)
+                    await page.mouse.click(target_x, target_y)
             
             # Wait for message textarea to appear
             try:
-                # Try multiple selectors with fallback logic
+                # Bounded wait for a visible DM input, falling back to generic inputs
                 message_input = None
-                selectors = [
-                    "div[contenteditable='true'][aria-label*='Message']",
-                    "input[placeholder*='Message']",
-                    "[role='textbox']",
-                    "[contenteditable='true']"
-                ]
-                
-                for selector in selectors:
-                    try:
-                        self.logger.info(f"Trying to find message input with selector: {selector}")
-                        message_input = await self.page.wait_for_selector(selector, timeout=5000)
-                        if message_input:
-                            self.logger.info(f"Found message input with selector: {selector}")
-                            break
-                    except Exception as e:
-                        self.logger.info(f"Selector {selector} failed: {str(e)}")
-                        continue
+                try:
+                    matched, message_input = await _find_visible(page, MESSAGE_INPUT_SELECTORS, 5000)
+                    if not message_input:
+                        matched, message_input = await _find_visible(page, MESSAGE_INPUT_FALLBACK_SELECTORS, 2000)
+                    if message_input:
+                        self.logger.info(f"Found message input with selector: {matched}")
+                except Exception as e:
+                    self.logger.info(f"Message input selectors failed: {str(e)}")
                 
                 if not message_input:                    
                     raise Exception("All selectors failed to find message input")
@@ -316,8 +554,6 @@ class InstagramMessageAutomator:
                 # Reduce the delay to prevent timeout issues
                 await add_delay(2, self.logger)
                 
-                await self.page.screenshot(path=state["screenshot_path"])
-                
                 # Re-check if the element is still attached before interacting
                 try:
                     # Alternative way to check if element is attached
@@ -325,12 +561,13 @@ class InstagramMessageAutomator:
                     is_visible = bounding_box is not None
                     self.logger.info(f"Message input visibility (via bounding box): {is_visible}")
                     
-                    await type_humanlike(self.page, message_input, personalized_message, 0.05, 0.25, self.logger)
+                    await type_humanlike(page, message_input, personalized_message, 0.05, 0.25, self.logger)
                     
                     # Add a natural pause after typing (as if reviewing the message)
                     await add_random_delays(0.5, 2.0, self.logger)
                     
-                    await self.page.screenshot(path=state["screenshot_path"])
+                    # Single screenshot for the confirmation UI
+                    await self.capture_screenshot(state)
                     
                     # Return state for message confirmation interrupt
                     return True, state
@@ -342,18 +579,19 @@ class InstagramMessageAutomator:
 
             except Exception as e:
                 self.logger.error(f"Failed to find message textarea: {str(e)}")
-                await self.page.go_back()
+                await page.go_back()
                 return False, state
         except Exception as e:
             self.logger.error(f"Error in prepare_and_type_message: {str(e)}")
             return False, state
             
     
-    async def send_message(self, state):
+    async def send_message(self, state, page=None):
         """Send the message after confirmation"""
+        page = page or self.page
         try:
             # Send the message programmatically after confirmation
-            await self.page.keyboard.press('Enter')
+            await page.keyboard.press('Enter')
             self.logger.info(f"Message sent after confirmation: '{state.get('message_text')}'")
             
             # Record the sent message in the database
@@ -361,11 +599,12 @@ class InstagramMessageAutomator:
             message_text = state.get("message_text")
             if profile_url and message_text:
                 await record_sent_message(profile_url, message_text)
+                self.messaged_profiles.update((profile_url, _extract_username(profile_url)))
                 
             # Add a delay after sending
             await add_random_delays(1.0, 3.0, self.logger)            
             await add_delay(2, self.logger)  # Final delay before going back
-            await self.page.go_back()
+            await page.go_back()
             return True
         except Exception as e:
             self.logger.error(f"Error sending message: {str(e)}")
@@ -373,70 +612,77 @@ class InstagramMessageAutomator:
             
     async def run(self, state, delay=5, max_profiles=None):
         """Run the automation process."""
-        async with async_playwright() as playwright:
-            try:
-                if not self.load_profiles():
-                    state["error_message"] = "Failed to load profiles from CSV"
-                    state["workflow_status"] = "error"
-                    return state
+        try:
+            if not self.load_profiles():
+                state["error_message"] = "Failed to load profiles from CSV"
+                state["workflow_status"] = "error"
+                return state
+            
+            # Load already-messaged profiles once and drop them from the queue up front
+            self.messaged_profiles = await load_messaged_profiles()
+            self.drop_messaged_profiles()
+                
+            await self.setup()
+            
+            # Login with interrupt for confirmation
+            state = await self.login(state)
+            if state.get("error_message"):
+                return state
+            
+            # Process will continue after login confirmation in the workflow
                     
-                await self.setup(playwright)
+            # Process profiles
+            processed = 0
+            successful = 0
+            
+            profiles_to_process = self.profiles
+            if max_profiles:
+                profiles_to_process = self.profiles[:max_profiles]
                 
-                # Login with interrupt for confirmation
-                state = await self.login(state)
-                if state.get("error_message"):
-                    return state
+            for profile in profiles_to_process:
+                processed += 1
                 
-                # Process will continue after login confirmation in the workflow
-                        
-                # Process profiles
-                processed = 0
-                successful = 0
+                # Process each profile with interrupts for confirmation
+                success, updated_state = await self.analyze_profile(profile['profile_url'], state, username=profile['username'])
+                state.update(updated_state)  # Update state with any changes
                 
-                profiles_to_process = self.profiles
-                if max_profiles:
-                    profiles_to_process = self.profiles[:max_profiles]
-                    
-                for profile in profiles_to_process:
-                    processed += 1
-                    
-                    # Process each profile with interrupts for confirmation
-                    success, updated_state = await self.analyze_profile(profile['profile_url'], state)
-                    state.update(updated_state)  # Update state with any changes
-                    
-                    if success:
-                        # The message is ready to be sent, but we need confirmation
-                        # This will be handled by the message_confirmation node
-                        # After confirmation, send_message will be called
-                        return state
+                if success:
+                    # The message is ready to be sent, but we need confirmation
+                    # This will be handled by the message_confirmation node
+                    # After confirmation, send_message will be called
+                    return state
+                
+                # If we reach here, there was an error with this profile
+                continue
                     
-                    # If we reach here, there was an error with this profile
-                    continue
-                        
-                self.logger.info(f"Completed processing {processed} profiles. Successfully messaged: {successful}")
-                state["automation_result"] = {
-                    "success": True,
-                    "processed": processed,
-                    "successful": successful,
-                    "message": f"Successfully processed {processed} profiles. Successfully messaged: {successful}"
-                }
-                state["workflow_status"] = "completed"
-                return state
-            except Exception as e:
-                error_msg = f"Error in Instagram messaging: {str(e)}"
-                self.logger.error(error_msg)
-                state["error_message"] = error_msg
-                state["workflow_status"] = "error"
-                return state
-            finally:
-                # Ensure browser is properly closed even if exceptions occur
-                if self.browser:
-                    await self.browser.close()
-                # The playwright instance is stopped by the context manager
+            self.logger.info(f"Completed processing {processed} profiles. Successfully messaged: {successful}")
+            state["automation_result"] = build_automation_result(processed, successful)
+            state["workflow_status"] = "completed"
+            return state
+        except Exception as e:
+            error_msg = f"Error in Instagram messaging: {str(e)}"
+            self.logger.error(error_msg)
+            state["error_message"] = error_msg
+            state["workflow_status"] = "error"
+            return state
+        finally:
+            # Close only our context; the shared browser stays warm for the next run
+            await self.close()
 
 class InstagramMessageWorkflow(BaseWorkflow):
     """Workflow for sending Instagram messages"""
     
+    def __init__(self):
+        # Created in initialize_automation
+        self.automator = None
+        # DataFrame parsed during CSV validation, reused when loading profiles
+        self._profiles_df = None
+        # profile_url -> task for upcoming profiles analyzed during message confirmation
+        self._prefetch = {}
+        # (digest, data URL) of the last encoded screenshot, so identical frames are not re-encoded
+        self._last_screenshot = None
+        super().__init__()
+    
     def _register_interrupt_configs(self) -> Dict[str, InterruptConfig]:
         """Register interrupt configurations for this workflow"""
         return {
@@ -461,15 +707,29 @@ class InstagramMessageWorkflow(BaseWorkflow):
             # Removed edit_confirmation as it's merged with message_confirmation
         }
     
+    def _encode_screenshot(self, state: Dict) -> Optional[str]:
+        """Encode the in-memory screenshot as a JPEG data URL so it can travel in JSON"""
+        screenshot = state.get("screenshot_bytes")
+        if not screenshot:
+            return None
+        
+        digest = hashlib.blake2b(screenshot, digest_size=8).digest()
+        if self._last_screenshot is None or self._last_screenshot[0] != digest:
+            data_url = "data:image/jpeg;base64," + base64.b64encode(screenshot).decode("ascii")
+            self._last_screenshot = (digest, data_url)
+        return self._last_screenshot[1]
+    
     def _build_custom_interrupt_data(self, state: Dict, config: InterruptConfig) -> Dict[str, Any]:
         """Add custom data to interrupt based on type"""
         if config.interrupt_type == "login_confirmation":
             return {
-                "screenshot": state.get("screenshot_path")
+                "screenshot": state.get("screenshot_path"),
+                "screenshot_data_url": self._encode_screenshot(state)
             }
         elif config.interrupt_type == "message_confirmation":
             return {
                 "screenshot": state.get("screenshot_path"),
+                "screenshot_data_url": self._encode_screenshot(state),
                 "profile_url": state.get("current_profile_url"),
                 "message_text": state.get("message_text")
             }
@@ -477,15 +737,7 @@ class InstagramMessageWorkflow(BaseWorkflow):
     
     def _validate_login_confirmation(self, user_input: str, context: Dict) -> Dict[str, Any]:
         """Validate login confirmation input"""
-        if user_input.lower() in ["yes", "y", "yes, i've logged in"]:
-            return {"valid": True, "confirmed": True}
-        elif user_input.lower() in ["no", "n", "cancel"]:
-            return {"valid": True, "confirmed": False}
-        else:
-            return {
-                "valid": False,
-                "error_message": "Please confirm with 'Yes' or cancel with 'No'"
-            }
+        return validate_login_confirmation(user_input, context)
     
     def _build_validation_context(self, state: Dict, config: InterruptConfig) -> Dict[str, Any]:
       """Build validation context for Instagram message workflow"""
@@ -505,12 +757,9 @@ class InstagramMessageWorkflow(BaseWorkflow):
     
     def _validate_message_confirmation(self, user_input: str, context: Dict) -> Dict[str, Any]:
         """Validate message confirmation input"""
-        if user_input.lower() in ["yes", "y", "send", "send message"]:
-            return {"valid": True, "action": "send"}
-        elif user_input.lower() in ["no", "n", "skip", "skip this profile"]:
-            return {"valid": True, "action": "skip"}
-        elif user_input.lower() in ["cancel", "end", "quit", "exit"]:
-            return {"valid": True, "action": "cancel"}
+        action = _MESSAGE_REPLIES.get(user_input.strip().lower())
+        if action:
+            return {"valid": True, "action": action}
         else:
             # Treat any other input as an edited message that needs confirmation
             return {
@@ -567,7 +816,7 @@ class InstagramMessageWorkflow(BaseWorkflow):
         workflow.add_conditional_edges(
             "process_profiles",
             self.route_after_processing,
-            {"message_confirmation": "message_confirmation", "finalize_automation": "finalize_automation", "END": END}
+            {"message_confirmation": "message_confirmation", "finalize_automation": "finalize_automation"}
         )
         # Removed edit_confirmation from the workflow
         workflow.add_edge("prepare_message", "send_message")  # Changed to go straight to send_message
@@ -590,14 +839,19 @@ class InstagramMessageWorkflow(BaseWorkflow):
         
         # Use the CSV file path from the uploads directory
         upload_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "uploads")
-        csv_files = []
+        newest = None
         
         if os.path.exists(upload_dir):
-            csv_files = [os.path.join(upload_dir, f) for f in os.listdir(upload_dir) if f.endswith(".csv")]
+            # Use the most recent CSV file from uploads directory; DirEntry caches its stat
+            with os.scandir(upload_dir) as entries:
+                newest = max(
+                    (e for e in entries if e.name.endswith(".csv")),
+                    key=lambda e: e.stat().st_ctime,
+                    default=None
+                )
         
-        if csv_files:
-            # Use the most recent CSV file from uploads directory
-            csv_path = max(csv_files, key=os.path.getctime)
+        if newest:
+            csv_path = newest.path
         else:
             # No uploaded CSV file found
             csv_path = None
@@ -640,8 +894,7 @@ class InstagramMessageWorkflow(BaseWorkflow):
         csv_path = state.get("csv_path")
         
         try:
-            import pandas as pd
-            df = pd.read_csv(csv_path)
+            df = _pd().read_csv(csv_path, engine="c", usecols=_profile_column, dtype=PROFILE_CSV_DTYPES)
             
             # Check for required columns
             required_columns = ["profile_url"]
@@ -652,6 +905,7 @@ class InstagramMessageWorkflow(BaseWorkflow):
                 state["workflow_status"] = "error"
             else:
                 logger.info(f"CSV validated successfully with {len(df)} profiles")
+                self._profiles_df = df
                 
         except Exception as e:
             state["error_message"] = f"Error validating CSV: {str(e)}"
@@ -670,31 +924,38 @@ class InstagramMessageWorkflow(BaseWorkflow):
         """Initialize the Instagram message automator"""
         state = self.update_step(state, "automation_initialization")
         
+        # Drop prefetches left by a previous run, whose pages belong to its closed context
+        await self._discard_prefetch()
+        
         try:
-            # Store the playwright instance at the class level so it stays alive
-            self.playwright = await async_playwright().start()
-            
             # Create automator instance with reference to this workflow
+            # Visible by default so the user can log in; headless only works with a saved session.
+            # The shared browser keeps whichever mode it was first launched with.
+            headless = get_config().get('instagram_message_workflow', {}).get('headless', False)
             self.automator = InstagramMessageAutomator(
                 csv_path=state.get("csv_path"),
-                headless=False,  # Keep visible for Instagram
+                headless=headless,
                 workflow_instance=self
             )
             
-            # Load profiles
-            if not self.automator.load_profiles():
+            # Load profiles from the DataFrame parsed during validation
+            profiles_df, self._profiles_df = self._profiles_df, None
+            if not self.automator.load_profiles(profiles_df):
                 state["error_message"] = "Failed to load profiles from CSV"
                 state["workflow_status"] = "error"
                 return state
             
-            # Setup browser without using a context manager
-            await self.automator.setup(self.playwright)
+            # Load already-messaged profiles once and drop them from the queue up front
+            self.automator.messaged_profiles = await load_messaged_profiles()
+            self.automator.drop_messaged_profiles()
+            
+            # Setup browser, reusing a warm context from the pool if available
+            await self.automator.setup()
             
             # Navigate to Instagram login page
             await self.automator.page.goto("https://www.instagram.com/accounts/login/")
             
-
-            await self.automator.page.screenshot(path=state["screenshot_path"])
+            await self.automator.capture_screenshot(state)
             
             self.automator.logger.info("Please log in to Instagram manually in the browser window.")
             
@@ -707,8 +968,8 @@ class InstagramMessageWorkflow(BaseWorkflow):
             state["workflow_status"] = "error"
             
             # Clean up resources if there's an error
-            if hasattr(self, 'playwright'):
-                await self.playwright.stop()
+            if self.automator is not None:
+                await self.automator.close()
             
             return state
     
@@ -723,6 +984,11 @@ class InstagramMessageWorkflow(BaseWorkflow):
         """Process the next profile or finalize if done"""
         state = self.update_step(state, "profile_processing")
         
+        # First pass after the login was confirmed: save the session right away, so it
+        # survives the browser being closed or the run ending on an error
+        if not state.get("processed") and not state.get("message_sent") and state.get("current_profile_url") is None:
+            await self.automator.save_storage_state()
+        
         # Check if we're continuing after sending a message
         if state.get("message_sent"):
             # Clear the flag and continue with the next profile
@@ -749,37 +1015,94 @@ class InstagramMessageWorkflow(BaseWorkflow):
         max_profiles = state.get("max_profiles", 10)
         processed = state.get("processed", 0)
         
-        # Check if there are more profiles to process
-        if processed < len(profiles_to_process) and processed < max_profiles:
+        # Pull profiles until one is ready for confirmation or the list is exhausted
+        while processed < len(profiles_to_process) and processed < max_profiles:
             profile = profiles_to_process[processed]
             
-            # Process the profile with interrupts for confirmation
-            success, updated_state = await self.automator.analyze_profile(profile['profile_url'], state)
-            state.update(updated_state)  # Update state with any changes
+            # Use the analysis that ran while the previous message was confirmed, if any
+            prefetched = await self._take_prefetch(profile['profile_url'])
+            if not prefetched:
+                # Analyze on a fresh page so Chromium can free the previous profile's DOM
+                prefetched = await self._prefetch_profile(profile, dict(state))
+            
+            success, updated_state, page = prefetched
+            for key in PREFETCH_STATE_KEYS:
+                if key in updated_state:
+                    state[key] = updated_state[key]
             
             if success:
+                # Switch to the page that is already on this profile
+                await self.automator.page.close()
+                self.automator.page = page
+                state["processed"] = processed
+                
+                # Analyze the next profiles while the user reviews this message
+                self._start_prefetch(processed + 1, state)
+                
                 # The message is ready to be sent, but we need confirmation
                 # This will be handled by the message_confirmation node
                 return state
-            else:
-                # If there was an error with this profile, increment processed count and try next one
-                state["processed"] = processed + 1
-                return await self.process_profiles(state)  # Recursively process next profile
-        else:
-            # We're done or there was an error
-            state["automation_result"] = {
-                "success": True,
-                "processed": state.get("processed", 0),
-                "successful": state.get("successful", 0),
-                "message": f"Successfully processed {state.get('processed', 0)} profiles. Successfully messaged: {state.get('successful', 0)}"
-            }
-            state["workflow_status"] = "completed"
-            return state
+            
+            # If there was an error with this profile, move on to the next one
+            await page.close()
+            processed += 1
+        
+        # We're done with all profiles
+        state["processed"] = processed
+        state["automation_result"] = build_automation_result(processed, state.get("successful", 0))
+        state["workflow_status"] = "completed"
+        return state
+    
+    def _start_prefetch(self, index: int, state: InstagramMessageState):
+        """Start analyzing the next PREFETCH_DEPTH profiles from index on separate pages in the background"""
+        profiles = self.automator.profiles
+        end = min(index + PREFETCH_DEPTH, len(profiles), state.get("max_profiles", 10))
+        
+        for profile in profiles[index:end]:
+            profile_url = profile['profile_url']
+            if profile_url not in self._prefetch:
+                self._prefetch[profile_url] = asyncio.create_task(self._prefetch_profile(profile, dict(state)))
+    
+    async def _prefetch_profile(self, profile: Dict, state: Dict):
+        """Analyze one profile on its own page, returning (success, state, page)"""
+        page = await self.automator.new_page()
+        try:
+            success, updated_state = await self.automator.analyze_profile(
+                profile['profile_url'], state, page, profile['username']
+            )
+        except Exception:
+            await page.close()
+            raise
+        return success, updated_state, page
+    
+    async def _take_prefetch(self, profile_url: str):
+        """Return (success, state, page) from the prefetch for profile_url, if there is one"""
+        task = self._prefetch.pop(profile_url, None)
+        if task is None:
+            return None
+        
+        try:
+            return await task
+        except Exception as e:
+            logger.error(f"Prefetched analysis failed for {profile_url}: {str(e)}")
+            return None
+    
+    async def _discard_prefetch(self):
+        """Wait for any pending prefetches and close their pages"""
+        tasks = list(self._prefetch.values())
+        self._prefetch = {}
+        for task in tasks:
+            try:
+                _, _, page = await task
+                await page.close()
+            except Exception as e:
+                logger.error(f"Error discarding prefetched profile: {str(e)}")
     
     def route_after_processing(self, state: InstagramMessageState) -> str:
         """Route after processing a profile"""
         if state.get("error_message"):
-            return "END"
+            # Finalize so background prefetches and the browser context are cleaned up
+            return "finalize_automation"
         elif state.get("current_profile_url") is not None and state.get("message_text") is not None:
             # We have a message ready for confirmation
             return "message_confirmation"
@@ -791,14 +1114,12 @@ class InstagramMessageWorkflow(BaseWorkflow):
         """Handle workflow cancellation"""
         state = self.update_step(state, "workflow_cancellation")
         
-        # Set cancellation state
+        # Set cancellation state; drop the raw screenshot since the final state is returned as JSON
+        state["screenshot_bytes"] = None
         state["workflow_status"] = "cancelled"
-        state["automation_result"] = {
-            "success": False,
-            "processed": state.get("processed", 0),
-            "successful": state.get("successful", 0),
-            "message": "Workflow cancelled by user"
-        }
+        state["automation_result"] = build_automation_result(
+            state.get("processed", 0), state.get("successful", 0), cancelled=True
+        )
         
         return state
 
@@ -815,16 +1136,8 @@ class InstagramMessageWorkflow(BaseWorkflow):
     
     def route_after_message_confirmation(self, state: InstagramMessageState) -> str:
         """Route after message confirmation"""
-        # Check the action based on message_confirmed value
-        if state.get("message_confirmed") == "cancel":
-            return "cancel_workflow"  # Route to the new cancel_workflow node
-        elif state.get("message_confirmed") == "send":
-            return "prepare_message"
-        elif state.get("message_confirmed") == "edit":
-            # For edited messages, loop back to message_confirmation
-            return "message_confirmation"
-        else:  # "skip" or any other value
-            return "skip_profile"
+        # "skip" or any other value skips the profile
+        return _CONFIRMATION_ROUTES.get(state.get("message_confirmed"), "skip_profile")
     
 
     async def prepare_message(self, state: InstagramMessageState):
@@ -872,63 +1185,169 @@ class InstagramMessageWorkflow(BaseWorkflow):
         
         # Ensure we have a result
         if not state.get("automation_result"):
-            state["automation_result"] = {
-                "success": True,
-                "processed": state.get("processed", 0),
-                "successful": state.get("successful", 0),
-                "message": f"Successfully processed {state.get('processed', 0)} profiles. Successfully messaged: {state.get('successful', 0)}"
-            }
+            state["automation_result"] = build_automation_result(
+                state.get("processed", 0), state.get("successful", 0)
+            )
         
-        # Clean up resources
+        # Clean up resources; the shared browser stays warm for the next run
         try:
-            if hasattr(self, 'automator') and self.automator and self.automator.browser:
-                await self.automator.browser.close()
-            
-            if hasattr(self, 'playwright'):
-                await self.playwright.stop()
+            await flush_sent_messages()
+            await self._discard_prefetch()
+            if self.automator is not None:
+                await self.automator.close()
         except Exception as e:
             logger.error(f"Error cleaning up resources: {str(e)}")
         
-        state["workflow_status"] = "completed"
+        # Final state is returned to API clients as JSON, which can't carry raw bytes
+        state["screenshot_bytes"] = None
+        # Runs routed here after a failed step still report the error
+        state["workflow_status"] = "error" if state.get("error_message") else "completed"
         return state
 
 
 # helper function
-async def check_if_profile_messaged(profile_url):
-    """Check if a profile has already been messaged"""
+def build_automation_result(processed, successful, cancelled=False):
+    """Build the automation_result summary stored in workflow state"""
+    if cancelled:
+        message = "Workflow cancelled by user"
+    else:
+        message = f"Successfully processed {processed} profiles. Successfully messaged: {successful}"
+    return {
+        "success": not cancelled,
+        "processed": processed,
+        "successful": successful,
+        "message": message
+    }
+
+def check_if_profile_messaged(profile_url, messaged_profiles, username=None):
+    """Check if a profile has already been messaged, against the set from load_messaged_profiles"""
+    username = username or _extract_username(profile_url)
+    
+    # Check by both profile URL and username for robustness
+    return profile_url in messaged_profiles or username in messaged_profiles
+
+def _read_messaged_profiles():
+    """Read the profile URLs and usernames of all sent messages"""
+    with get_db_context() as (conn, cursor):
+        cursor.execute("SELECT profile_url, username FROM sent_messages")
+        messaged = set()
+        for profile_url, username in cursor.fetchall():
+            messaged.add(profile_url)
+            if username:
+                messaged.add(username)
+        return messaged
+
+async def load_messaged_profiles():
+    """Load the profile URLs and usernames of all profiles messaged so far"""
     try:
-        with get_db_context() as (conn, cursor):
-            # Extract username from profile URL
-            username = profile_url.split('/')[-2] if profile_url.endswith('/') else profile_url.split('/')[-1]
-            
-            # Check by both profile URL and username for robustness
-            cursor.execute(
-                "SELECT * FROM sent_messages WHERE profile_url = ? OR username = ?", 
-                (profile_url, username)
-            )
-            result = cursor.fetchone()
-            
-            if result:
-                return True
-            return False
+        # sqlite3 blocks, so read in a worker thread to keep the browser coroutines responsive
+        return await asyncio.to_thread(_read_messaged_profiles)
     except Exception as e:
-        return False
+        logger.error(f"Error loading messaged profiles: {str(e)}")
+        return set()
+
+# Sent-message rows waiting for the background writer, which commits them in batches
+_sent_queue = None
+_sent_writer = None
+# Rows whose write failed every attempt; retried with the next batch or flush, since they
+# feed the already-messaged check
+_sent_unwritten = []
+
+# Attempts per batch write, the delay before the first retry (doubled each time), and how
+# long flush_sent_messages waits on the writer before writing what is left itself
+SENT_WRITE_ATTEMPTS = 3
+SENT_WRITE_RETRY_DELAY = 0.5
+SENT_FLUSH_TIMEOUT = 10
+
+def _write_sent_messages(rows):
+    """Insert a batch of sent-message rows in a single transaction"""
+    with get_db_context() as (conn, cursor):
+        cursor.executemany(
+            "INSERT OR REPLACE INTO sent_messages (profile_url, username, message_text, sent_date, success) VALUES (?, ?, ?, ?, ?)",
+            rows
+        )
+
+async def _write_sent_messages_with_retry(rows):
+    """Write rows, retrying with backoff; rows that still fail are kept in _sent_unwritten"""
+    delay = SENT_WRITE_RETRY_DELAY
+    for attempt in range(1, SENT_WRITE_ATTEMPTS + 1):
+        try:
+            await asyncio.to_thread(_write_sent_messages, rows)
+            return True
+        except Exception as e:
+            logger.warning(f"Error recording {len(rows)} sent messages (attempt {attempt}/{SENT_WRITE_ATTEMPTS}): {str(e)}")
+            if attempt < SENT_WRITE_ATTEMPTS:
+                await asyncio.sleep(delay)
+                delay *= 2
+    logger.error(f"Could not record {len(rows)} sent messages; keeping them for the next write")
+    _sent_unwritten.extend(rows)
+    return False
+
+def _take_unwritten():
+    """Remove and return the rows left over from failed writes"""
+    rows = list(_sent_unwritten)
+    _sent_unwritten.clear()
+    return rows
+
+async def _sent_message_writer(queue):
+    """Drain the queue, writing whatever has accumulated with one commit per batch"""
+    while True:
+        rows = [await queue.get()]
+        while not queue.empty():
+            rows.append(queue.get_nowait())
+        queued = len(rows)
+        rows = _take_unwritten() + rows
+        try:
+            await _write_sent_messages_with_retry(rows)
+        except asyncio.CancelledError:
+            # Keep the batch so a flush can still write it
+            _sent_unwritten.extend(rows)
+            raise
+        finally:
+            for _ in range(queued):
+                queue.task_done()
 
 async def record_sent_message(profile_url, message_text, success=True):
-    """Record a sent message in the database"""
+    """Queue a sent message to be recorded in the database by the background writer"""
+    global _sent_queue, _sent_writer
     try:
-        # Extract username from profile URL
-        username = profile_url.split('/')[-2] if profile_url.endswith('/') else profile_url.split('/')[-1]
+        username = _extract_username(profile_url)
         
-        with get_db_context() as (conn, cursor):
-            cursor.execute(
-                "INSERT OR REPLACE INTO sent_messages (profile_url, username, message_text, sent_date, success) VALUES (?, ?, ?, ?, ?)",
-                (profile_url, username, message_text, datetime.now().isoformat(), 1 if success else 0)
-            )
-            return True
+        if _sent_queue is None:
+            _sent_queue = asyncio.Queue()
+        if _sent_writer is None or _sent_writer.done():
+            _sent_writer = asyncio.create_task(_sent_message_writer(_sent_queue))
+        
+        _sent_queue.put_nowait(
+            (profile_url, username, message_text, time.strftime("%Y-%m-%dT%H:%M:%S"), 1 if success else 0)
+        )
+        return True
     except Exception as e:
+        logger.error(f"Error queueing sent message for {profile_url}: {str(e)}")
         return False
 
+async def flush_sent_messages(timeout=SENT_FLUSH_TIMEOUT):
+    """Wait until every queued sent message has been written to the database.
+    
+    If the writer is not running or does not finish within timeout, the remaining rows
+    are written directly instead, so shutdown never hangs on a dead writer.
+    """
+    if _sent_queue is None:
+        return
+    if _sent_writer is not None and not _sent_writer.done():
+        try:
+            await asyncio.wait_for(_sent_queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Sent message writer did not finish within {timeout}s; writing remaining rows directly")
+    
+    # Drain whatever the writer left behind: queued rows and rows from failed writes
+    rows = _take_unwritten()
+    while not _sent_queue.empty():
+        rows.append(_sent_queue.get_nowait())
+        _sent_queue.task_done()
+    if rows:
+        await _write_sent_messages_with_retry(rows)
+
 async def main():
     # Path to the CSV file
     csv_path = r"c:\Users\Zongjie\Documents\GitHub\content-create-agent\collaboration_opportunities\fitness_instagram_collaborations_20250616_201553.csv"
@@ -947,8 +1366,10 @@ async def main():
             print("Data:", result.get("data", {}))
             print("-"*50 + "\n")
             
-            # Get user input
-            user_input = input("Enter your response (or 'cancel' to stop): ")
+            # Let queued DB writes land, then read input off the event loop so
+            # background prefetches keep running while the user decides
+            await flush_sent_messages()
+            user_input = await asyncio.to_thread(input, "Enter your response (or 'cancel' to stop): ")
             
             # Resume the workflow with user input
             thread_id = result.get("thread_id")
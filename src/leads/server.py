@@ -1,9 +1,12 @@
 import os
+import csv
+import shutil
 import asyncio
 import logging
 import time
 import random
 from uuid import uuid4
+from collections import OrderedDict, deque
 from typing import List, Dict, Any, Optional
 from traceback import print_exc
 # Add these imports at the top of the file
@@ -12,66 +15,103 @@ import httpx
 from fastapi import FastAPI, Request, HTTPException, Response, File, UploadFile
 from fastapi.encoders import jsonable_encoder
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.status import HTTP_422_UNPROCESSABLE_ENTITY
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, PrivateAttr, field_validator, model_validator
 import uvicorn
 import bleach
 
 # Import workflow classes
 from .instagram_collaboration_workflow import InstagramCollaborationWorkflow
-from .instagram_message_workflow import InstagramMessageWorkflow
+from .instagram_message_workflow import InstagramMessageWorkflow, close_shared_browser, flush_sent_messages
 from ..base_workflow import BaseWorkflow
+from ..utils import config_loader
+from ..utils.gemini_client import initialize_client
+from ..utils.resource_path import get_resource_path
+
+# Cancellable operation types mapped to the workflow type whose stop event they set
+OPERATION_WORKFLOW_TYPES = {"message": "messaging", "collaboration": "collaboration"}
 
-# With these lines
-# Global stop events for different workflow types
-messaging_stop_event = None
-collaboration_stop_event = None
 # Set up logging
 logging.basicConfig(level=os.environ.get('LOGLEVEL', 'INFO').upper())
 logger = logging.getLogger(__name__)
 
-# Simple in-memory session manager for leads server
+# Session limits; interrupted workflows can wait on a human for hours, so the TTL is generous
+MAX_SESSIONS = 10000
+SESSION_TTL_SECONDS = 24 * 3600
+SESSION_PURGE_INTERVAL_SECONDS = 60
+# Messages kept per conversation; older turns are dropped first
+MAX_HISTORY = 200
+
+# Simple in-memory session manager for leads server, bounded by LRU eviction and an idle TTL
 class LeadsSessionManager:
-    def __init__(self):
-        self.sessions = {}
+    def __init__(self, max_sessions: int = MAX_SESSIONS, ttl: float = SESSION_TTL_SECONDS):
+        self.sessions = OrderedDict()  # Least recently used first
         self.conversations = {}
+        self.max_sessions = max_sessions
+        self.ttl = ttl
     
     def create_session(self, session_id: str) -> bool:
-        """Create a new session"""
+        """Create a new session, evicting the least recently used ones beyond max_sessions"""
         if session_id not in self.sessions:
+            now = time.time()
             self.sessions[session_id] = {
-                "created_at": time.time(),
-                "last_activity": time.time(),
+                "created_at": now,
+                "last_activity": now,
                 "thread_id": session_id
             }
-            self.conversations[session_id] = []
+            self.conversations[session_id] = deque(maxlen=MAX_HISTORY)
+            while len(self.sessions) > self.max_sessions:
+                oldest_id = next(iter(self.sessions))
+                self.delete_conversation(oldest_id)
             return True
         return False
     
     def is_session(self, session_id: str) -> bool:
-        """Check if session exists"""
-        return session_id in self.sessions
+        """Check if session exists and has not expired"""
+        info = self.sessions.get(session_id)
+        if info is None:
+            return False
+        if info["last_activity"] < time.time() - self.ttl:
+            self.delete_conversation(session_id)
+            return False
+        return True
     
     def get_session_info(self, session_id: str) -> Optional[Dict]:
         """Get session information"""
-        return self.sessions.get(session_id)
+        info = self.sessions.get(session_id)
+        if info is not None:
+            self.sessions.move_to_end(session_id)
+        return info
     
     def update_session_info(self, session_id: str, info: Dict) -> None:
         """Update session information"""
         if session_id in self.sessions:
             self.sessions[session_id].update(info)
             self.sessions[session_id]["last_activity"] = time.time()
+            self.sessions.move_to_end(session_id)
+    
+    def purge_expired(self) -> int:
+        """Delete sessions idle for longer than the TTL, returning how many were removed"""
+        cutoff = time.time() - self.ttl
+        expired = [sid for sid, info in self.sessions.items() if info["last_activity"] < cutoff]
+        for session_id in expired:
+            self.delete_conversation(session_id)
+        return len(expired)
     
     def get_conversation(self, session_id: str) -> List[Dict]:
-        """Get conversation history"""
-        return self.conversations.get(session_id, [])
+        """Get a copy of the conversation history"""
+        return list(self.conversations.get(session_id, ()))
+    
+    def conversation_length(self, session_id: str) -> int:
+        """Get the number of stored conversation messages"""
+        return len(self.conversations.get(session_id, ()))
     
     def save_conversation(self, session_id: str, user_id: str, messages: List[Dict]) -> None:
-        """Save conversation messages"""
+        """Save conversation messages, keeping at most MAX_HISTORY of them"""
         if session_id not in self.conversations:
-            self.conversations[session_id] = []
+            self.conversations[session_id] = deque(maxlen=MAX_HISTORY)
         self.conversations[session_id].extend(messages)
         self.update_session_info(session_id, {"user_id": user_id})
     
@@ -81,21 +121,25 @@ class LeadsSessionManager:
         self.conversations.pop(session_id, None)
 
 # Pydantic models
+VALID_ROLES = frozenset({'user', 'assistant', 'system'})
+
 class Message(BaseModel):
     """Definition of the Chat Message type."""
-    role: str = Field(description="Role for a message AI, User and System", default="user", max_length=256, pattern=r'[\s\S]*')
-    content: str = Field(description="The input query/prompt to the pipeline.", default="Hello what can you do?", max_length=131072, pattern=r'[\s\S]*')
+    role: str = Field(description="Role for a message AI, User and System", default="user", max_length=256)
+    content: str = Field(description="The input query/prompt to the pipeline.", default="Hello what can you do?", max_length=131072)
 
-    @validator('role')
+    @field_validator('role')
+    @classmethod
     def validate_role(cls, value):
         """Field validator function to validate values of the field role"""
-        value = bleach.clean(value, strip=True)
-        valid_roles = {'user', 'assistant', 'system'}
-        if value.lower() not in valid_roles:
+        # Only the three known roles are accepted, so there is no markup to sanitize
+        value = value.lower()
+        if value not in VALID_ROLES:
             raise ValueError("Role must be one of 'user', 'assistant', or 'system'")
-        return value.lower()
+        return value
 
-    @validator('content')
+    @field_validator('content')
+    @classmethod
     def sanitize_content(cls, v):
         """Field validator function to sanitize user populated fields from HTML"""
         v = bleach.clean(v, strip=True)
@@ -105,23 +149,39 @@ class Message(BaseModel):
 
 class LeadsPrompt(BaseModel):
     """Definition of the Leads Prompt API data type."""
-    messages: List[Message] = Field(..., description="A list of messages comprising the conversation so far.", max_items=50000)
+    messages: List[Dict[str, Any]] = Field(..., description="A list of messages comprising the conversation so far.", max_length=1000)
     user_id: str = Field(None, description="A unique identifier representing your end-user.")
     session_id: str = Field(..., description="A unique identifier representing the session associated with the response.")
     workflow_type: str = Field(..., description="Type of workflow: 'collaboration' or 'messaging'")
     parameters: Dict[str, Any] = Field(default={}, description="Additional parameters for the workflow")
+    _last_user_message: Optional[str] = PrivateAttr(default=None)
+
+    @model_validator(mode='after')
+    def validate_last_user_message(self):
+        """Validate and sanitize only the latest user message, the one the workflows consume"""
+        for raw_message in reversed(self.messages):
+            # A missing role means "user", as Message.role defaults to it
+            if str(raw_message.get('role', 'user')).lower() == 'user':
+                self._last_user_message = Message.model_validate(raw_message).content
+                break
+        return self
+
+    @property
+    def last_user_message(self) -> Optional[str]:
+        """Sanitized content of the latest user message, if any"""
+        return self._last_user_message
 
 class LeadsResponseChoices(BaseModel):
     """Definition of Leads response choices"""
     index: int = Field(default=0, ge=0, le=256, format="int64")
     message: Message = Field(default=Message())
-    finish_reason: str = Field(default="", max_length=4096, pattern=r'[\s\S]*')
+    finish_reason: str = Field(default="", max_length=4096)
     options: Optional[List[str]] = Field(default=None, description="Options for user interaction")
 
 class LeadsResponse(BaseModel):
     """Definition of Leads APIs response data type"""
-    id: str = Field(default="", max_length=100000, pattern=r'[\s\S]*')
-    choices: List[LeadsResponseChoices] = Field(default=[], max_items=256)
+    id: str = Field(default="", max_length=100000)
+    choices: List[LeadsResponseChoices] = Field(default=[], max_length=256)
     session_id: str = Field(None, description="A unique identifier representing the session associated with the response.")
     workflow_status: str = Field(default="", description="Current workflow status")
     interrupt_data: Optional[Dict] = Field(default=None, description="Data for workflow interrupts")
@@ -130,12 +190,12 @@ class CreateSessionResponse(BaseModel):
     session_id: str = Field(max_length=4096)
 
 class HealthResponse(BaseModel):
-    message: str = Field(max_length=4096, pattern=r'[\s\S]*', default="")
+    message: str = Field(max_length=4096, default="")
 
 class FileUploadResponse(BaseModel):
-    filename: str = Field(max_length=4096, pattern=r'[\s\S]*')
-    filepath: str = Field(max_length=4096, pattern=r'[\s\S]*')
-    message: str = Field(max_length=4096, pattern=r'[\s\S]*', default="File uploaded successfully")
+    filename: str = Field(max_length=4096)
+    filepath: str = Field(max_length=4096)
+    message: str = Field(max_length=4096, default="File uploaded successfully")
 
 # FastAPI app setup
 tags_metadata = [
@@ -151,6 +211,7 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_tags=tags_metadata,
+    default_response_class=ORJSONResponse,
 )
 
 # CORS middleware
@@ -164,20 +225,47 @@ app.add_middleware(
 )
 
 # Fallback responses
-FALLBACK_RESPONSES = [
+FALLBACK_RESPONSES = (
     "Please try re-phrasing, I am likely having some trouble with that question.",
     "I will get better with time, please try with a different question.",
     "I wasn't able to process your input. Let's try something else.",
     "Something went wrong. Could you try again in a few seconds with a different question?",
     "Oops, that proved a tad difficult for me, can you retry with another question?"
-]
+)
+
+def fallback_response(session_id: str) -> ORJSONResponse:
+    """Build an error response with a random fallback message, bypassing model validation"""
+    return ORJSONResponse(
+        content={
+            "id": uuid4().hex,
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {
+                        "role": "assistant",
+                        "content": random.choice(FALLBACK_RESPONSES)
+                    },
+                    "finish_reason": "stop"
+                }
+            ],
+            "session_id": session_id,
+            "workflow_status": "error"
+        }
+    )
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize the leads server components"""
     try:
-        # Initialize session manager
+        # Initialize session manager and its periodic expiry sweep
         app.session_manager = LeadsSessionManager()
+        app.session_purge_task = asyncio.create_task(purge_expired_sessions())
+        
+        # Shared HTTP client so config-change notifications reuse keep-alive connections
+        app.http_client = httpx.AsyncClient(
+            timeout=5.0,
+            limits=httpx.Limits(max_keepalive_connections=10)
+        )
         
         # Initialize workflow instances
         app.collaboration_workflow = InstagramCollaborationWorkflow()
@@ -189,6 +277,22 @@ async def startup_event():
         logger.error(f"Failed to initialize leads server: {str(e)}")
         raise RuntimeError(f"Leads server initialization failed: {str(e)}")
 
+async def purge_expired_sessions():
+    """Periodically drop idle sessions so long-running servers don't accumulate them"""
+    while True:
+        await asyncio.sleep(SESSION_PURGE_INTERVAL_SECONDS)
+        removed = app.session_manager.purge_expired()
+        if removed:
+            logger.info(f"Purged {removed} expired sessions")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Flush queued sent-message records and close the shared HTTP client and browser"""
+    app.session_purge_task.cancel()
+    await app.http_client.aclose()
+    await flush_sent_messages()
+    await close_shared_browser()
+
 @app.exception_handler(RequestValidationError)
 async def request_validation_exception_handler(
     request: Request, exc: RequestValidationError
@@ -207,14 +311,10 @@ async def health_check():
 @app.get("/create_session", tags=["Session Management"], response_model=CreateSessionResponse)
 async def create_session():
     """Create a new session for workflow management"""
-    for _ in range(5):
-        session_id = str(uuid4())
-        
-        if not app.session_manager.is_session(session_id):
-            app.session_manager.create_session(session_id)
-            return CreateSessionResponse(session_id=session_id)
-    
-    raise HTTPException(status_code=500, detail="Unable to generate session_id")
+    # uuid4 collisions are negligible, so there is no need to check and retry
+    session_id = uuid4().hex
+    app.session_manager.create_session(session_id)
+    return CreateSessionResponse(session_id=session_id)
 
 @app.delete("/delete_session")
 async def delete_session(session_id: str):
@@ -225,24 +325,19 @@ async def delete_session(session_id: str):
     app.session_manager.delete_conversation(session_id)
     return {"message": "Session deleted successfully"}
 
-@app.post("/generate", tags=["Leads Workflows"], response_model=LeadsResponse)
+@app.post("/generate", tags=["Leads Workflows"], response_model=None, responses={200: {"model": LeadsResponse}})
 async def generate_workflow_response(
     request: Request,
     prompt: LeadsPrompt
-) -> JSONResponse:
+) -> ORJSONResponse:
     """Generate response for leads workflows with LangGraph interrupt/resume support"""
     
-    logger.info(f"Input at /generate endpoint: {prompt.dict()}")
-    global messaging_stop_event, collaboration_stop_event
+    logger.info(f"Input at /generate endpoint: {prompt.model_dump()}")
     # Select workflow based on type
     if prompt.workflow_type == "collaboration":
         workflow = app.collaboration_workflow
-        collaboration_stop_event = asyncio.Event()
-        stop_event = collaboration_stop_event
     elif prompt.workflow_type == "messaging":
         workflow = app.messaging_workflow
-        messaging_stop_event = asyncio.Event()
-        stop_event = messaging_stop_event
     else:
         raise HTTPException(status_code=400, detail="Invalid workflow type")
     
@@ -253,23 +348,7 @@ async def generate_workflow_response(
         # Validate session
         if not app.session_manager.is_session(prompt.session_id):
             logger.error(f"No session_id created {prompt.session_id}. Please create session id before generate request.")
-            return JSONResponse(
-                content={
-                    "id": str(uuid4()),
-                    "choices": [
-                        {
-                            "index": 0,
-                            "message": {
-                                "role": "assistant",
-                                "content": random.choice(FALLBACK_RESPONSES)
-                            },
-                            "finish_reason": "stop"
-                        }
-                    ],
-                    "session_id": prompt.session_id,
-                    "workflow_status": "error"
-                }
-            )
+            return fallback_response(prompt.session_id)
         
         # Get session info
         session_info = app.session_manager.get_session_info(prompt.session_id)
@@ -282,13 +361,16 @@ async def generate_workflow_response(
                 {"cancelled_operation": None, "cancelled_at": None}
             )
         
-        # Get the last user message
-        chat_history = prompt.messages
-        last_user_message = next(
-            (message.content for message in reversed(chat_history) if message.role == 'user'),
-            None
+        # Each session gets its own stop event so concurrent sessions cancel independently
+        stop_event = asyncio.Event()
+        app.session_manager.update_session_info(
+            prompt.session_id,
+            {"stop_event": stop_event, "workflow_type": prompt.workflow_type}
         )
         
+        # Get the last user message, validated when the request was parsed
+        last_user_message = prompt.last_user_message
+        
         if not last_user_message:
             raise HTTPException(status_code=400, detail="No user message found")
         
@@ -314,18 +396,11 @@ async def generate_workflow_response(
                     logger.info(f"Resuming interrupted workflow for session {prompt.session_id}")
                     
                     # Resume workflow with user input
-                    task = asyncio.create_task(
-                        workflow.resume(last_user_message, prompt.session_id, stop_event)
-                    )
-                    result = await task
+                    result = await workflow.resume(last_user_message, prompt.session_id, stop_event)
                 else:
                     # Start new workflow
                     logger.info(f"Starting new {prompt.workflow_type} workflow for session {prompt.session_id}")
-                    # Use asyncio.create_task to run the workflow
-                    task = asyncio.create_task(
-                        workflow.run(last_user_message, prompt.session_id, stop_event)
-                    )
-                    result = await task
+                    result = await workflow.run(last_user_message, prompt.session_id, stop_event)
             
             except Exception as workflow_error:
                 logger.error(f"Workflow execution error: {str(workflow_error)}")
@@ -338,11 +413,14 @@ async def generate_workflow_response(
             logger.warning(f"Workflow {prompt.workflow_type} does not have LangGraph app, using basic execution")
             result = {"workflow_status": "completed", "message": "Workflow executed successfully"}
         
-        workflow_status = result.get("status")
+        # Errors raised while running the workflow are reported under workflow_status
+        workflow_status = result.get("status", result.get("workflow_status", ""))
             
-        # Create response object with the complete result data
-        leads_response = LeadsResponse(
+        # Create response object with the complete result data; the fields are built here,
+        # so skip walking the whole result dict through validation
+        leads_response = LeadsResponse.model_construct(
             id=resp_id,
+            choices=[],
             session_id=prompt.session_id,
             workflow_status=workflow_status,
             interrupt_data=result  # Pass the entire result object instead of just interrupt_data
@@ -401,33 +479,17 @@ async def generate_workflow_response(
             prompt.session_id,
             prompt.user_id or "",
             [
-                {"role": "user", "content": last_user_message, "timestamp": f"{user_query_timestamp}"},
-                {"role": "assistant", "content": resp_str, "timestamp": f"{time.time()}"},
+                {"role": "user", "content": last_user_message, "timestamp": user_query_timestamp},
+                {"role": "assistant", "content": resp_str, "timestamp": time.time()},
             ],
         )
         
-        return JSONResponse(content=leads_response.dict())
+        return ORJSONResponse(content=leads_response.model_dump())
     
     except Exception as e:
         logger.error(f"Unhandled Error from /generate endpoint. Error details: {e}")
         print_exc()
-        return JSONResponse(
-            content={
-                "id": str(uuid4()),
-                "choices": [
-                    {
-                        "index": 0,
-                        "message": {
-                            "role": "assistant",
-                            "content": random.choice(FALLBACK_RESPONSES)
-                        },
-                        "finish_reason": "stop"
-                    }
-                ],
-                "session_id": prompt.session_id,
-                "workflow_status": "error"
-            }
-        )
+        return fallback_response(prompt.session_id)
 
 @app.get("/workflows", tags=["Leads Workflows"])
 async def list_workflows():
@@ -454,12 +516,11 @@ async def get_session_status(session_id: str):
         raise HTTPException(status_code=404, detail="Session not found")
     
     session_info = app.session_manager.get_session_info(session_id)
-    conversation = app.session_manager.get_conversation(session_id)
     
     return {
         "session_id": session_id,
-        "session_info": session_info,
-        "conversation_length": len(conversation),
+        "session_info": {key: value for key, value in session_info.items() if key != "stop_event"},
+        "conversation_length": app.session_manager.conversation_length(session_id),
         "last_activity": session_info.get("last_activity")
     }
 
@@ -476,30 +537,26 @@ async def upload_csv(file: UploadFile = File(...)):
         os.makedirs(upload_dir, exist_ok=True)
         
         # Clear the uploads directory first
-        for existing_file in os.listdir(upload_dir):
-            existing_file_path = os.path.join(upload_dir, existing_file)
-            if os.path.isfile(existing_file_path):
-                os.remove(existing_file_path)
+        await asyncio.to_thread(_clear_directory, upload_dir)
         
-        # Save the file
+        # Save the file, streaming it in 1 MB chunks rather than buffering it whole
         file_path = os.path.join(upload_dir, file.filename)
-        contents = await file.read()
-        
-        # Write the file and ensure it's properly closed
         with open(file_path, "wb") as f:
-            f.write(contents)
+            while chunk := await file.read(1 << 20):
+                f.write(chunk)
         
         # Make sure the file handle is closed before validation
         await file.close()
         
         # Validate CSV format
         try:
-            import pandas as pd
-            df = pd.read_csv(file_path)
+            # Only the header row is needed to check the columns
+            with open(file_path, newline='', encoding='utf-8-sig') as f:
+                header = next(csv.reader(f), [])
             
             # Check for required columns
             required_columns = ["profile_url"]
-            missing_columns = [col for col in required_columns if col not in df.columns]
+            missing_columns = [col for col in required_columns if col not in header]
             
             if missing_columns:
                 # Remove the invalid file
@@ -523,6 +580,22 @@ async def upload_csv(file: UploadFile = File(...)):
         logger.error(f"Error uploading CSV file: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error uploading file: {str(e)}")
 
+def _clear_directory(directory: str) -> None:
+    """Delete the files in a directory; scandir entries carry their file type already"""
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_file():
+                os.unlink(entry.path)
+
+def _write_csv(file_path: str, csv_data: List[Dict[str, Any]]) -> None:
+    """Write rows to a CSV file, taking the fieldnames from the first row"""
+    with open(file_path, 'w', newline='', encoding='utf-8') as csvfile:
+        fieldnames = list(csv_data[0].keys())
+        
+        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(csv_data)
+
 class CancelOperationRequest(BaseModel):
     session_id: str = Field(..., description="Session ID for the operation to cancel")
     operation_type: str = Field(..., description="Type of operation to cancel: 'search', 'message', etc.")
@@ -530,8 +603,6 @@ class CancelOperationRequest(BaseModel):
 @app.post("/cancel_operation", tags=["Leads Workflows"])
 async def cancel_operation(request: CancelOperationRequest):
     """Cancel an ongoing operation for a session"""
-    global messaging_stop_event, collaboration_stop_event
-    
     if not app.session_manager.is_session(request.session_id):
         raise HTTPException(status_code=404, detail="Session not found")
     
@@ -541,14 +612,13 @@ async def cancel_operation(request: CancelOperationRequest):
         {"cancelled_operation": request.operation_type, "cancelled_at": time.time()}
     )
     
-    # Set the appropriate stop event based on operation type
-    if request.operation_type == "message" and messaging_stop_event is not None:
-        messaging_stop_event.set()
-        logger.info(f"Messaging workflow abort signal sent for session {request.session_id}")
-        return {"message": f"Operation {request.operation_type} cancelled for session {request.session_id}"}
-    elif request.operation_type == "collaboration" and collaboration_stop_event is not None:
-        collaboration_stop_event.set()
-        logger.info(f"Collaboration workflow abort signal sent for session {request.session_id}")
+    # Set the session's stop event if it belongs to the requested operation type
+    session_info = app.session_manager.get_session_info(request.session_id)
+    stop_event = session_info.get("stop_event")
+    workflow_type = OPERATION_WORKFLOW_TYPES.get(request.operation_type)
+    if stop_event is not None and workflow_type == session_info.get("workflow_type"):
+        stop_event.set()
+        logger.info(f"{workflow_type.capitalize()} workflow abort signal sent for session {request.session_id}")
         return {"message": f"Operation {request.operation_type} cancelled for session {request.session_id}"}
     else:
         raise HTTPException(status_code=404, detail=f"No active {request.operation_type} operation found")
@@ -573,18 +643,8 @@ async def save_csv(request: Request):
         if not os.path.exists(file_path):
             raise HTTPException(status_code=404, detail=f"File {filename} not found")
         
-        # Write the updated CSV data back to the file
-        import csv
-        with open(file_path, 'w', newline='', encoding='utf-8') as csvfile:
-            if not csv_data:
-                raise HTTPException(status_code=400, detail="Empty CSV data")
-            
-            # Get the fieldnames from the first row
-            fieldnames = list(csv_data[0].keys())
-            
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(csv_data)
+        # Write the updated CSV data back to the file off the event loop
+        await asyncio.to_thread(_write_csv, file_path, csv_data)
         
         return FileUploadResponse(
             filename=filename,
@@ -599,29 +659,39 @@ async def save_csv(request: Request):
 
 # Add these Pydantic models with the other models
 class ConfigResponse(BaseModel):
-    config_content: str = Field(max_length=1000000, pattern=r'[\s\S]*')
-    message: str = Field(max_length=4096, pattern=r'[\s\S]*', default="Config loaded successfully")
+    config_content: str = Field(max_length=1000000)
+    message: str = Field(max_length=4096, default="Config loaded successfully")
 
 class SaveConfigRequest(BaseModel):
     config_content: str = Field(..., description="The updated config content")
 
-from src.utils.gemini_client import initialize_client
 initialize_client()
 
-from src.utils.resource_path import get_resource_path
+CONFIG_PATH = get_resource_path("config.yaml")
+
+# (mtime_ns, content) of the last config.yaml read, served until the file changes
+_config_cache = None
+
+def _read_config_content() -> str:
+    """Return the content of config.yaml, re-reading it only when its mtime changes"""
+    global _config_cache
+    mtime_ns = os.stat(CONFIG_PATH).st_mtime_ns
+    if _config_cache is None or _config_cache[0] != mtime_ns:
+        # Read the config file with UTF-8 encoding explicitly specified
+        with open(CONFIG_PATH, "r", encoding="utf-8") as f:
+            _config_cache = (mtime_ns, f.read())
+    return _config_cache[1]
+
+def _write_text(path: str, content: str) -> None:
+    """Write a UTF-8 text file"""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
 
 @app.get("/get_config", tags=["Configuration"], response_model=ConfigResponse)
 async def get_config():
     """Get the content of the config.yaml file"""
     try:
-        # Get the path to the config file
-        config_path = get_resource_path("config.yaml")
-        
-        # Read the config file with UTF-8 encoding explicitly specified
-        with open(config_path, "r", encoding="utf-8") as f:
-            config_content = f.read()
-        
-        return ConfigResponse(config_content=config_content)
+        return ConfigResponse(config_content=_read_config_content())
     except Exception as e:
         logger.error(f"Error reading config file: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error reading config file: {str(e)}")
@@ -629,9 +699,9 @@ async def get_config():
 @app.post("/save_config", tags=["Configuration"], response_model=ConfigResponse)
 async def save_config(request: SaveConfigRequest):
     """Save updated content to the config.yaml file and notify other services"""
+    global _config_cache
     try:
-        # Get the path to the config file
-        config_path = get_resource_path("config.yaml")
+        config_path = CONFIG_PATH
         
         # Validate YAML format
         try:
@@ -641,16 +711,14 @@ async def save_config(request: SaveConfigRequest):
         
         # Create a backup of the current config
         backup_path = f"{config_path}.bak"
-        with open(config_path, "r", encoding="utf-8") as src, open(backup_path, "w", encoding="utf-8") as dst:
-            dst.write(src.read())
+        await asyncio.to_thread(shutil.copyfile, config_path, backup_path)
         
         # Write the updated config
-        with open(config_path, "w", encoding="utf-8") as f:
-            f.write(request.config_content)
+        await asyncio.to_thread(_write_text, config_path, request.config_content)
+        _config_cache = None
         
         # Clear the config cache
-        from src.utils.config_loader import get_config
-        get_config.cache_clear()
+        config_loader.get_config.cache_clear()
             
         initialize_client()
         
@@ -683,18 +751,20 @@ async def notify_services_config_changed():
     
     results = {}
     
-    # Create an async HTTP client
-    async with httpx.AsyncClient(timeout=5.0) as client:
-        for service in services:
-            try:
-                response = await client.post(service["url"])
-                if response.status_code == 200:
-                    results[service["name"]] = "success"
-                else:
-                    results[service["name"]] = f"failed: {response.status_code}"
-            except Exception as e:
-                logger.error(f"Error notifying {service['name']} service: {str(e)}")
-                results[service["name"]] = f"error: {str(e)}"
+    # Notify all services concurrently over the shared client
+    responses = await asyncio.gather(
+        *(app.http_client.post(service["url"]) for service in services),
+        return_exceptions=True
+    )
+    
+    for service, response in zip(services, responses):
+        if isinstance(response, Exception):
+            logger.error(f"Error notifying {service['name']} service: {str(response)}")
+            results[service["name"]] = f"error: {str(response)}"
+        elif response.status_code == 200:
+            results[service["name"]] = "success"
+        else:
+            results[service["name"]] = f"failed: {response.status_code}"
     
     return results
 
@@ -712,7 +782,7 @@ def main():
     
     logger.info(f"Starting Leads server on {host}:{port}")
     
-    # Run the server
+    # Run the server; uvicorn uses uvloop and httptools when installed (not on Windows)
     uvicorn.run(
         "src.leads.server:app",  # Use the full module path
         host=host,
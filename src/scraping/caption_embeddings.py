@@ -1,20 +1,23 @@
 import json
+import asyncio
 import hashlib
 import logging
 import os
-from typing import List, Dict, Any, Optional, Tuple
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple, Union
 import numpy as np
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
 import threading
 from src.utils.gemini_client import get_client
 from src.utils.embedding_client import (
     EMBEDDING_TYPES,
     ensure_embedding_initialized, 
-    save_embeddings_batch, search_similar_embeddings, 
+    save_embeddings_batch, search_similar_embeddings_batch,
     get_collection_stats as get_embedding_stats,
-    load_all_text_hashes
+    load_all_text_hashes, load_embedding_snapshot
 )
 from src.utils.config_loader import get_config
+from src.utils.db_client import get_db_context, initialize_query_embeddings_table
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -23,15 +26,33 @@ logger = logging.getLogger(__name__)
 config = get_config()
 CLUSTERING_CONFIG = config.get('caption_clustering', {})
 LABELS = ["ad", "non-ad"]
+# Maximum number of texts per embed_content request, and how many requests run at once
+EMBED_BATCH_SIZE = 100
+EMBED_MAX_CONCURRENCY = 16
+# Embeddings handed to the collection per save, so a large run never builds one huge batch
+SAVE_CHUNK_SIZE = 512
+# ChromaDB-format custom filters per embedding type, built from config on first use
+_custom_filters_cache: Dict[str, Dict[str, Any]] = {}
 
+@lru_cache(maxsize=8192)
 def get_caption_hash(caption: str) -> str:
-    """Generate a hash for a caption."""
+    """Generate a hash for a caption, memoized since each text is hashed at every pipeline stage."""
     return hashlib.md5(caption.encode('utf-8')).hexdigest()
 
-# Global embeddings cache (kept for performance) with thread lock
+# Global embeddings cache (kept for performance); values are read-only float32 arrays so hits
+# are returned without any conversion. Reads are single dict lookups, atomic under the GIL, so
+# only writers take the lock. Insertion order doubles as eviction order once the cache is full.
+EMBEDDINGS_CACHE_SIZE = 10000
 embeddings_cache = {}
 cache_lock = threading.Lock()
 
+def cache_embedding(text_hash: str, embedding: np.ndarray) -> None:
+    """Add an embedding to the cache, evicting the oldest entries beyond EMBEDDINGS_CACHE_SIZE."""
+    with cache_lock:
+        embeddings_cache[text_hash] = embedding
+        while len(embeddings_cache) > EMBEDDINGS_CACHE_SIZE:
+            del embeddings_cache[next(iter(embeddings_cache))]
+
 def get_embedding(text: str) -> np.ndarray:
     """Get embedding for text, using cache if available."""
     # Initialize client
@@ -41,91 +62,279 @@ def get_embedding(text: str) -> np.ndarray:
     
     text_hash = get_caption_hash(text)
     
-    # Thread-safe cache access
-    with cache_lock:
-        if text_hash in embeddings_cache:
-            return np.array(embeddings_cache[text_hash], dtype=np.float32)
+    cached = embeddings_cache.get(text_hash)
+    if cached is not None:
+        return cached
     
-    # Generate new embedding
+    # Reuse an embedding persisted by an earlier run before calling the API
     embedding_model = CLUSTERING_CONFIG.get('embedding_model', 'text-embedding-004')
-    result = client.models.embed_content(
-        model=embedding_model,
-        contents=text
-    )
-    embedding = np.array(result.embeddings[0].values, dtype=np.float32)
+    embedding = load_query_embedding(embedding_model, text_hash)
     
-    # Thread-safe cache update
-    with cache_lock:
-        embeddings_cache[text_hash] = embedding.tolist()
+    if embedding is None:
+        # Generate new embedding
+        result = client.models.embed_content(
+            model=embedding_model,
+            contents=text
+        )
+        embedding = np.array(result.embeddings[0].values, dtype=np.float32)
+        save_query_embedding(embedding_model, text_hash, embedding)
+    embedding.setflags(write=False)
+    cache_embedding(text_hash, embedding)
     
     return embedding
 
-def save_caption_embeddings_batch(caption_data_list: List[Tuple[str, str, np.ndarray]], 
-                                tags_list: Optional[List[Dict[str, Any]]] = None) -> bool:
-    """Save multiple captions with their embeddings to the unified database.
+# SQLite caps bound parameters per statement, so IN (...) lookups are split into pages
+PERSISTED_LOOKUP_PAGE_SIZE = 500
+
+def load_query_embeddings(model: str, text_hashes: List[str]) -> Dict[str, np.ndarray]:
+    """Load persisted embeddings for the given hashes, returning those that were found."""
+    found = {}
+    try:
+        with get_db_context() as (conn, cursor):
+            for start in range(0, len(text_hashes), PERSISTED_LOOKUP_PAGE_SIZE):
+                page = text_hashes[start:start + PERSISTED_LOOKUP_PAGE_SIZE]
+                cursor.execute(
+                    f"SELECT text_hash, embedding FROM query_embeddings WHERE model = ? AND text_hash IN ({','.join('?' * len(page))})",
+                    (model, *page)
+                )
+                for text_hash, blob in cursor.fetchall():
+                    found[text_hash] = np.frombuffer(blob, dtype=np.float32)
+    except Exception as e:
+        logger.warning(f"Error loading persisted embeddings: {str(e)}")
+    return found
+
+def save_query_embeddings(model: str, items: List[Tuple[str, np.ndarray]]) -> None:
+    """Persist (text_hash, embedding) pairs as raw float32 bytes."""
+    if not items:
+        return
+    try:
+        with get_db_context() as (conn, cursor):
+            cursor.executemany(
+                "INSERT OR REPLACE INTO query_embeddings (model, text_hash, embedding) VALUES (?, ?, ?)",
+                [(model, text_hash, embedding.tobytes()) for text_hash, embedding in items]
+            )
+    except Exception as e:
+        logger.warning(f"Error saving persisted embeddings: {str(e)}")
+
+def load_query_embedding(model: str, text_hash: str) -> Optional[np.ndarray]:
+    """Load a persisted embedding, returning None if it has not been stored."""
+    return load_query_embeddings(model, [text_hash]).get(text_hash)
+
+def save_query_embedding(model: str, text_hash: str, embedding: np.ndarray) -> None:
+    """Persist an embedding as raw float32 bytes."""
+    save_query_embeddings(model, [(text_hash, embedding)])
+
+def _plan_embeddings(texts: List[str], model: str) -> Tuple[List[str], List[Optional[np.ndarray]], Dict[str, List[int]], List[List[int]]]:
+    """Look texts up in the memory and persisted caches and group the rest into request chunks.
+    
+    Returns:
+        Tuple of the text hashes, the embeddings found so far (None where missing), the
+        positions of each missing hash, and chunks of text indices to request
+    """
+    text_hashes = [get_caption_hash(text) for text in texts]
+    embeddings = [embeddings_cache.get(text_hash) for text_hash in text_hashes]
+    
+    # Embed each uncached text once, remembering every position it appears at
+    positions_by_hash = {}
+    for i, embedding in enumerate(embeddings):
+        if embedding is None:
+            positions_by_hash.setdefault(text_hashes[i], []).append(i)
+    
+    # Reuse embeddings persisted by earlier runs
+    for text_hash, embedding in load_query_embeddings(model, list(positions_by_hash)).items():
+        cache_embedding(text_hash, embedding)
+        for position in positions_by_hash.pop(text_hash):
+            embeddings[position] = embedding
+    missing = [positions[0] for positions in positions_by_hash.values()]
+    
+    chunks = [missing[start:start + EMBED_BATCH_SIZE] for start in range(0, len(missing), EMBED_BATCH_SIZE)]
+    return text_hashes, embeddings, positions_by_hash, chunks
+
+def _fill_embeddings(text_hashes: List[str], embeddings: List[Optional[np.ndarray]],
+                     positions_by_hash: Dict[str, List[int]], chunks: List[List[int]],
+                     chunk_results: List[Any], model: str) -> List[Optional[np.ndarray]]:
+    """Cache and persist the embeddings returned for each chunk and place them at every position
+    of their text. A chunk whose request failed (an exception in chunk_results) leaves None rows."""
+    generated = []
+    for chunk, chunk_embeddings in zip(chunks, chunk_results):
+        if isinstance(chunk_embeddings, BaseException):
+            logger.error(f"Embedding request for {len(chunk)} texts failed: {chunk_embeddings}")
+            continue
+        for i, values in zip(chunk, chunk_embeddings):
+            embedding = np.array(values.values, dtype=np.float32)
+            embedding.setflags(write=False)
+            cache_embedding(text_hashes[i], embedding)
+            generated.append((text_hashes[i], embedding))
+            for position in positions_by_hash[text_hashes[i]]:
+                embeddings[position] = embedding
+    save_query_embeddings(model, generated)
+    
+    return embeddings
+
+def get_embeddings_batch(texts: List[str]) -> np.ndarray:
+    """Get embeddings for several texts, requesting the uncached ones in batches.
+    
+    Args:
+        texts: Texts to embed
+    
+    Returns:
+        np.ndarray: float32 matrix with one row per text
+    """
+    if not texts:
+        return np.empty((0, 0), dtype=np.float32)
+    
+    # Initialize client
+    client = get_client()
+    if not client:
+        raise ValueError("Failed to initialize Gemini client")
+    
+    embedding_model = CLUSTERING_CONFIG.get('embedding_model', 'text-embedding-004')
+    text_hashes, embeddings, positions_by_hash, chunks = _plan_embeddings(texts, embedding_model)
+    
+    def embed_chunk(chunk: List[int]):
+        result = client.models.embed_content(
+            model=embedding_model,
+            contents=[texts[i] for i in chunk]
+        )
+        return result.embeddings
+    
+    # The requests are network-bound, so send several chunks concurrently
+    if len(chunks) > 1:
+        with ThreadPoolExecutor(max_workers=min(EMBED_MAX_CONCURRENCY, len(chunks))) as executor:
+            chunk_results = list(executor.map(embed_chunk, chunks))
+    else:
+        chunk_results = [embed_chunk(chunk) for chunk in chunks]
+    
+    return np.stack(_fill_embeddings(text_hashes, embeddings, positions_by_hash, chunks, chunk_results, embedding_model))
+
+async def aget_embeddings_batch(texts: List[str]) -> List[Optional[np.ndarray]]:
+    """Async variant of get_embeddings_batch that drives the requests from the event loop.
+    
+    A failed request only loses its own chunk: the embeddings of the other chunks are still
+    cached, persisted and returned.
     
     Args:
-        caption_data_list: List of tuples containing (caption_text, label, embedding)
-        tags_list: Optional list of metadata dictionaries for each caption
+        texts: Texts to embed
+    
+    Returns:
+        List[Optional[np.ndarray]]: float32 embedding per text, None where its request failed
+    """
+    if not texts:
+        return []
+    
+    # Initialize client
+    client = get_client()
+    if not client:
+        raise ValueError("Failed to initialize Gemini client")
+    
+    # Cache lookups and persistence touch SQLite, so they run in a worker thread
+    embedding_model = CLUSTERING_CONFIG.get('embedding_model', 'text-embedding-004')
+    text_hashes, embeddings, positions_by_hash, chunks = await asyncio.to_thread(_plan_embeddings, texts, embedding_model)
+    semaphore = asyncio.Semaphore(EMBED_MAX_CONCURRENCY)
+    
+    async def embed_chunk(chunk: List[int]):
+        async with semaphore:
+            result = await client.aio.models.embed_content(
+                model=embedding_model,
+                contents=[texts[i] for i in chunk]
+            )
+        return result.embeddings
+    
+    chunk_results = await asyncio.gather(*(embed_chunk(chunk) for chunk in chunks), return_exceptions=True)
+    
+    return await asyncio.to_thread(
+        _fill_embeddings, text_hashes, embeddings, positions_by_hash, chunks, chunk_results, embedding_model
+    )
+
+def _save_text_embeddings_batch(data_list: List[Tuple[str, np.ndarray]],
+                                tags_list: Optional[List[Dict[str, Any]]],
+                                existing_hashes: Optional[set],
+                                kind: str) -> bool:
+    """Save texts of one embedding type with their embeddings to the unified database.
+    
+    Args:
+        data_list: List of tuples containing (text, embedding)
+        tags_list: Optional list of metadata dictionaries for each text
+        existing_hashes: Optional snapshot of the hashes already stored, loaded if not given
+        kind: Embedding type, "caption" or "transcript"; selects the hash field and id prefix
     
     Returns:
         bool: True if successful, False otherwise
     """
-    if not caption_data_list:
-        logger.warning("No caption data provided for batch save")
+    if not data_list:
+        logger.warning(f"No {kind} data provided for batch save")
         return False
     
+    hash_field = f"{kind}_hash"
+    # Captions use the post_url as ID; transcripts are prefixed to distinguish them from captions
+    id_prefix = "" if kind == "caption" else f"{kind}_"
+    
     try:
-        ensure_embedding_initialized()
-        
-        # Prepare data for unified collection
+        # Prepare data for unified collection, saving it SAVE_CHUNK_SIZE entries at a time
         embeddings_data = []
+        saved_count = 0
         skipped_count = 0
-        existing_hashes = load_all_text_hashes()
+        if existing_hashes is None:
+            existing_hashes = load_all_text_hashes()
+        seen_hashes = set()
         
-        for i, (caption_text, embedding) in enumerate(caption_data_list):
+        for i, (text, embedding) in enumerate(data_list):
                 
-            caption_hash = get_caption_hash(caption_text)
-            if caption_hash in existing_hashes:
-                logger.info(f"Skipping duplicate caption with hash {caption_hash}")
+            text_hash = get_caption_hash(text)
+            if text_hash in existing_hashes or text_hash in seen_hashes:
+                logger.info(f"Skipping duplicate {kind} with hash {text_hash}")
                 skipped_count += 1
                 continue
+            seen_hashes.add(text_hash)
             
-            # Prepare metadata with label and tags
-            metadata = {
-                "caption_hash": caption_hash
-            }
+            # Prepare metadata with label and custom tags, if provided
+            tags = tags_list[i] if tags_list and i < len(tags_list) else {}
+            metadata = {hash_field: text_hash, **tags}
             
-            # Add custom tags if provided
-            if tags_list and i < len(tags_list):
-                metadata.update(tags_list[i])
-            
-            # Get post_url from tags if available, otherwise use caption_hash as fallback
-            post_id = tags_list[i].get("post_url", caption_hash) if tags_list and i < len(tags_list) else caption_hash
+            # Get post_url from tags if available, otherwise use the hash as fallback
+            post_id = tags.get("post_url", text_hash)
             
             embeddings_data.append({
-                "id": post_id,  # Use post_url as ID instead of caption_hash
-                "embedding": embedding.tolist(),
+                "id": f"{id_prefix}{post_id}",
+                "embedding": embedding,
                 "metadata": metadata,
-                "document": caption_text
+                "document": text
             })
+            
+            if len(embeddings_data) == SAVE_CHUNK_SIZE:
+                if not save_embeddings_batch(embeddings_data, embedding_type=kind):
+                    return False
+                saved_count += len(embeddings_data)
+                embeddings_data = []
         
-        # Save to unified collection if we have any non-duplicate entries
+        # Save the remaining non-duplicate entries to unified collection
         if embeddings_data:
-            success = save_embeddings_batch(embeddings_data)
-            
-            if success:
-                logger.info(f"Saved {len(embeddings_data)} caption embeddings to unified collection (skipped {skipped_count} duplicates)")
-            
-            return success
+            if not save_embeddings_batch(embeddings_data, embedding_type=kind):
+                return False
+            saved_count += len(embeddings_data)
+        
+        if saved_count:
+            logger.info(f"Saved {saved_count} {kind} embeddings to unified collection (skipped {skipped_count} duplicates)")
         else:
-            logger.info(f"No new captions to save (skipped {skipped_count} duplicates)")
-            return True
+            logger.info(f"No new {kind}s to save (skipped {skipped_count} duplicates)")
+        return True
         
     except Exception as e:
-        logger.error(f"Error saving caption embeddings batch: {str(e)}")
+        logger.error(f"Error saving {kind} embeddings batch: {str(e)}")
         return False
 
+def save_caption_embeddings_batch(caption_data_list: List[Tuple[str, np.ndarray]], 
+                                tags_list: Optional[List[Dict[str, Any]]] = None,
+                                existing_hashes: Optional[set] = None) -> bool:
+    """Save multiple captions with their embeddings to the unified database."""
+    return _save_text_embeddings_batch(caption_data_list, tags_list, existing_hashes, kind="caption")
+
+def save_transcript_embeddings_batch(transcript_data_list: List[Tuple[str, np.ndarray]], 
+                                   tags_list: Optional[List[Dict[str, Any]]] = None,
+                                   existing_hashes: Optional[set] = None) -> bool:
+    """Save multiple transcripts with their embeddings to the unified database."""
+    return _save_text_embeddings_batch(transcript_data_list, tags_list, existing_hashes, kind="transcript")
+
 def generate_similar_embeddings_wrapper(content_to_style: str, 
                             embedding_type: str,
                             num_examples: int = 3, 
@@ -148,16 +357,14 @@ def generate_similar_embeddings_wrapper(content_to_style: str,
             if "label" in filter_tags:
                 del filter_tags["label"]
 
-        # Search with tag filtering
-        results = search_similar_embeddings(
-            query_embedding=content_embedding,
+        # Search with tag filtering, fetching only the caption texts
+        similar_captions = search_similar_embeddings_batch(
+            query_embeddings=content_embedding.reshape(1, -1),
             embedding_type=embedding_type,
             tag_filters=filter_tags,
-            n_results=num_examples
-        )
-        
-        # Extract caption texts from results
-        similar_captions = [result["document"] for result in results]
+            n_results=num_examples,
+            documents_only=True
+        )[0]
         
         logger.info(f"Found {len(similar_captions)} similar captions")
         return similar_captions
@@ -166,6 +373,43 @@ def generate_similar_embeddings_wrapper(content_to_style: str,
         logger.error(f"Error generating similar captions: {str(e)}")
         return []
 
+def generate_similar_embeddings_batch(contents: List[str],
+                            embedding_type: str,
+                            num_examples: int = 3,
+                            filter_tags: Optional[Dict[str, Any]] = None) -> List[List[str]]:
+    """Find similar captions for several contents with one embedding request and one search.
+    
+    Args:
+        contents: The contents to find similar captions for
+        num_examples: Number of similar captions to return per content
+        filter_tags: Optional metadata filters for more targeted search
+    
+    Returns:
+        List[List[str]]: Similar caption texts for each content, in input order
+    """
+    
+    try:
+        # Get embeddings for all contents at once
+        content_embeddings = get_embeddings_batch(contents)
+        if embedding_type == "transcript" and filter_tags and "label" in filter_tags:
+            del filter_tags["label"]
+        
+        # Search with tag filtering, all queries in one call
+        similar_captions = search_similar_embeddings_batch(
+            query_embeddings=content_embeddings,
+            embedding_type=embedding_type,
+            tag_filters=filter_tags,
+            n_results=num_examples,
+            documents_only=True
+        )
+        
+        logger.info(f"Found similar captions for {len(similar_captions)} contents")
+        return similar_captions
+        
+    except Exception as e:
+        logger.error(f"Error generating similar captions: {str(e)}")
+        return [[] for _ in contents]
+
 def generate_content_in_style(label: str, content_to_style: str, embedding_type: str,  examples: List[str] = None) -> str:
     """Generate new content based on the specified label style (ad or non-ad)."""
     logger.info(f"Generating {embedding_type} content")
@@ -220,9 +464,13 @@ def generate_content_in_style(label: str, content_to_style: str, embedding_type:
         logger.error(f"Error generating content: {str(e)}", exc_info=True)
         return f"Error generating content: {str(e)}"
 
-def apply_style_to_content(content: str, embedding_type: EMBEDDING_TYPES, num_examples: int = 3, 
-                         filter_tags: Optional[Dict[str, Any]] = None) -> str:
-    """Apply the specified style to content using similar examples from unified database."""
+def apply_style_to_content(content: Union[str, List[str]], embedding_type: EMBEDDING_TYPES, num_examples: int = 3, 
+                         filter_tags: Optional[Dict[str, Any]] = None) -> Union[str, List[str]]:
+    """Apply the specified style to content using similar examples from unified database.
+    
+    A list of contents is styled together: their examples are retrieved with one batched
+    search, and a list of styled contents is returned in the same order.
+    """
     
     # Initialize filter_tags if None
     if filter_tags is None:
@@ -233,6 +481,14 @@ def apply_style_to_content(content: str, embedding_type: EMBEDDING_TYPES, num_ex
         filter_tags.update(custom_filters)
     
     target_label = filter_tags.get("label", "non-ad")
+    
+    if isinstance(content, list):
+        examples_per_content = generate_similar_embeddings_batch(content, embedding_type, num_examples, filter_tags)
+        return [
+            generate_content_in_style(target_label, item, embedding_type, examples)
+            for item, examples in zip(content, examples_per_content)
+        ]
+    
     # Get similar examples
     examples = None
     try:
@@ -255,16 +511,37 @@ def get_collection_stats() -> Dict[str, Any]:
         logger.error(f"Error getting collection stats: {str(e)}")
         return {}
 
+def reload_config():
+    """Refresh the module config and drop the custom filters built from the previous one."""
+    global config, CLUSTERING_CONFIG
+    config = get_config()
+    CLUSTERING_CONFIG = config.get('caption_clustering', {})
+    _custom_filters_cache.clear()
+
 def initialize_caption_utils():
     """Initialize caption utils by ensuring embedding client is ready."""
     logger.info("Initializing caption utils with unified embedding database...")
     
+    reload_config()
     ensure_embedding_initialized()
+    initialize_query_embeddings_table()
+    # Styling searches run against an in-memory copy of the collection while it is current
+    load_embedding_snapshot()
     stats = get_collection_stats()
     logger.info(f"Caption utils initialized with unified collection: {stats}")
     return stats
 
-def process_captions(posts_dict: Dict[str, Any]) -> Dict[str, Any]:
+def _pair_embedded(texts: List[str], tags_list: List[Dict[str, Any]],
+                   embeddings: List[Optional[np.ndarray]]) -> Tuple[List[Tuple[str, np.ndarray]], List[Dict[str, Any]], int]:
+    """Pair texts with their embeddings, dropping those without one.
+    
+    Returns:
+        Tuple of the (text, embedding) pairs, their tags, and how many texts were dropped
+    """
+    kept = [(text, embedding, tags) for text, embedding, tags in zip(texts, embeddings, tags_list) if embedding is not None]
+    return [(text, embedding) for text, embedding, _ in kept], [tags for _, _, tags in kept], len(texts) - len(kept)
+
+async def process_captions(posts_dict: Dict[str, Any]) -> Dict[str, Any]:
     """Complete pipeline: generate embeddings and store in unified database.
     
     Args:
@@ -276,84 +553,65 @@ def process_captions(posts_dict: Dict[str, Any]) -> Dict[str, Any]:
     
     logger.info(f"Processing {len(posts_dict)} posts with unified database")
     
-    # Collect caption data for batch processing
-    caption_data_list = []
-    transcript_data_list = []
-    tags_list = []
+    # Snapshot the stored hashes once; texts already stored would be skipped when saving, so
+    # they are not embedded at all. ChromaDB calls block, so they run in a worker thread.
+    existing_hashes = await asyncio.to_thread(load_all_text_hashes)
     
-    # Prepare data for multithreaded processing
-    caption_tasks = []
-    transcript_tasks = []
+    # Collect texts for batch processing, keeping each list's tags aligned with it
+    captions = []
+    caption_tags = []
+    transcripts = []
+    transcript_tags = []
     
     for post_url, post_data in posts_dict.items():
         caption = post_data.get('caption', '')
         transcript = post_data.get('transcript', '')
         tags = post_data.get('tags', {})
         
-        tags_list.append(tags)
-        
-        if caption:
-            caption_tasks.append((caption, len(caption_tasks)))
-        
-        if transcript:
-            transcript_tasks.append((transcript, len(transcript_tasks)))
-    
-    # Process embeddings with multithreading
-    max_workers = min(32, (len(caption_tasks) + len(transcript_tasks)) or 1)
-    
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # Submit caption embedding tasks
-        caption_futures = {}
-        for caption, index in caption_tasks:
-            future = executor.submit(get_embedding, caption)
-            caption_futures[future] = (caption, index)
+        if caption and get_caption_hash(caption) not in existing_hashes:
+            captions.append(caption)
+            caption_tags.append(tags)
         
-        # Submit transcript embedding tasks
-        transcript_futures = {}
-        for transcript, index in transcript_tasks:
-            future = executor.submit(get_embedding, transcript)
-            transcript_futures[future] = (transcript, index)
-        
-        # Collect caption results
-        caption_results = [None] * len(caption_tasks)
-        for future in as_completed(caption_futures):
-            try:
-                embedding = future.result()
-                caption, index = caption_futures[future]
-                caption_results[index] = (caption, embedding)
-            except Exception as e:
-                caption, index = caption_futures[future]
-                logger.error(f"Error processing caption embedding: {e}")
-                # Skip failed embeddings
-        
-        # Collect transcript results
-        transcript_results = [None] * len(transcript_tasks)
-        for future in as_completed(transcript_futures):
-            try:
-                embedding = future.result()
-                transcript, index = transcript_futures[future]
-                transcript_results[index] = (transcript, embedding)
-            except Exception as e:
-                transcript, index = transcript_futures[future]
-                logger.error(f"Error processing transcript embedding: {e}")
-                # Skip failed embeddings
-    
-    # Filter out None results (failed embeddings)
-    caption_data_list = [result for result in caption_results if result is not None]
-    transcript_data_list = [result for result in transcript_results if result is not None]
-    
-    # Save all caption embeddings to unified collection in a single batch operation
-    caption_success = save_caption_embeddings_batch(caption_data_list, tags_list)
-    transcript_success = save_transcript_embeddings_batch(transcript_data_list, tags_list)
+        if transcript and get_caption_hash(transcript) not in existing_hashes:
+            transcripts.append(transcript)
+            transcript_tags.append(tags)
+    
+    logger.info(f"Embedding {len(captions)} new captions and {len(transcripts)} new transcripts")
+    
+    # Generate embeddings for captions and transcripts together, so they share request
+    # chunks and a text appearing as both is only embedded once
+    try:
+        embeddings = await aget_embeddings_batch(captions + transcripts)
+    except Exception as e:
+        logger.error(f"Error processing embeddings: {e}")
+        embeddings = [None] * (len(captions) + len(transcripts))
+    
+    # Keep the texts whose embedding request succeeded, with their tags still aligned
+    caption_data_list, caption_tags, failed_captions = _pair_embedded(captions, caption_tags, embeddings[:len(captions)])
+    transcript_data_list, transcript_tags, failed_transcripts = _pair_embedded(transcripts, transcript_tags, embeddings[len(captions):])
+    if failed_captions or failed_transcripts:
+        logger.warning(f"Could not embed {failed_captions} captions and {failed_transcripts} transcripts")
+    
+    # Save all caption embeddings to unified collection in a single batch operation, checking
+    # both kinds against the same snapshot of the stored hashes; having nothing new to save
+    # is not a failure, but texts that could not be embedded are
+    caption_success = not failed_captions
+    transcript_success = not failed_transcripts
+    if caption_data_list:
+        caption_success = await asyncio.to_thread(save_caption_embeddings_batch, caption_data_list, caption_tags, existing_hashes) and caption_success
+    if transcript_data_list:
+        transcript_success = await asyncio.to_thread(save_transcript_embeddings_batch, transcript_data_list, transcript_tags, existing_hashes) and transcript_success
     
     # Get collection stats
-    stats = get_collection_stats()
+    stats = await asyncio.to_thread(get_collection_stats)
     
     # Return summary
     result = {
         'total_posts': len(posts_dict),
         'total_captions': len(caption_data_list),
         'total_transcripts': len(transcript_data_list),
+        'failed_captions': failed_captions,
+        'failed_transcripts': failed_transcripts,
         'collection_stats': stats,
         'caption_success': caption_success,
         'transcript_success': transcript_success,
@@ -363,86 +621,22 @@ def process_captions(posts_dict: Dict[str, Any]) -> Dict[str, Any]:
     logger.info(f"Processing complete: {result}")
     return result
 
-def save_transcript_embeddings_batch(transcript_data_list: List[Tuple[str, str, np.ndarray]], 
-                                   tags_list: Optional[List[Dict[str, Any]]] = None) -> bool:
-    """Save multiple transcripts with their embeddings to the unified database.
-    
-    Args:
-        transcript_data_list: List of tuples containing (transcript_text, label, embedding)
-        tags_list: Optional list of metadata dictionaries for each transcript
-    
-    Returns:
-        bool: True if successful, False otherwise
-    """
-    if not transcript_data_list:
-        logger.warning("No transcript data provided for batch save")
-        return False
-    
-    try:
-        ensure_embedding_initialized()
-        
-        # Prepare data for unified collection
-        embeddings_data = []
-        skipped_count = 0
-        existing_hashes = load_all_text_hashes()
-        
-        for i, (transcript_text, embedding) in enumerate(transcript_data_list):
-                
-            transcript_hash = get_caption_hash(transcript_text)
-            if transcript_hash in existing_hashes:
-                logger.info(f"Skipping duplicate transcript with hash {transcript_hash}")
-                skipped_count += 1
-                continue
-            
-            # Prepare metadata with label and tags
-            metadata = {
-                "transcript_hash": transcript_hash
-            }
-            
-            # Add custom tags if provided
-            if tags_list and i < len(tags_list):
-                metadata.update(tags_list[i])
-            
-            # Get post_url from tags if available, otherwise use transcript_hash as fallback
-            post_id = tags_list[i].get("post_url", transcript_hash) if tags_list and i < len(tags_list) else transcript_hash
-            
-            embeddings_data.append({
-                "id": f"transcript_{post_id}",  # Prefix with transcript_ to distinguish from captions
-                "embedding": embedding.tolist(),
-                "metadata": metadata,
-                "document": transcript_text
-            })
-        
-        # Save to unified collection if we have any non-duplicate entries
-        if embeddings_data:
-            # Use embedding_type="transcript" for transcript embeddings
-            success = save_embeddings_batch(embeddings_data, embedding_type="transcript")
-            
-            if success:
-                logger.info(f"Saved {len(embeddings_data)} transcript embeddings to unified collection (skipped {skipped_count} duplicates)")
-            
-            return success
-        else:
-            logger.info(f"No new transcripts to save (skipped {skipped_count} duplicates)")
-            return True
-        
-    except Exception as e:
-        logger.error(f"Error saving transcript embeddings batch: {str(e)}")
-        return False
-
 def load_custom_filters(embedding_type: EMBEDDING_TYPES) -> Dict[str, Any]:
     """
     Load custom filters from config.yaml and convert them to ChromaDB format.
     
+    Filters are built once per embedding type from the module config; reload_config() drops them.
+    
     Returns:
         Dict[str, Any]: Formatted filters ready for ChromaDB operations
     """
+    cached = _custom_filters_cache.get(embedding_type)
+    if cached is not None:
+        return dict(cached)
+    
     logger.info("Loading custom filters from config")
     
     try:
-        # Get configuration
-        config = get_config()
-        
         # Extract custom filters from caption_clustering section
         custom_filters_config = config.get(f"{embedding_type}_clustering", {}).get('custom_filters', {})
         
@@ -458,8 +652,9 @@ def load_custom_filters(embedding_type: EMBEDDING_TYPES) -> Dict[str, Any]:
             elif len(usernames) > 1:
                 # Multiple values filter (OR condition in ChromaDB)
                 chroma_filters['username'] = {"$in": usernames}
-        return chroma_filters
+        _custom_filters_cache[embedding_type] = chroma_filters
+        return dict(chroma_filters)
 
     except Exception as e:
         logger.error(f"Error loading custom filters: {str(e)}")
-        return {}
\ No newline at end of file
+        return {}
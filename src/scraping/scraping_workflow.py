@@ -186,7 +186,7 @@ class InstagramScrapingWorkflow(BaseWorkflow):
                     'tags': tags
                 }
             
-            result = process_captions(posts_dict)
+            result = await process_captions(posts_dict)
 
             
             # Update state with results
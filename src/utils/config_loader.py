@@ -5,7 +5,11 @@ from .resource_path import get_resource_path
 
 @lru_cache(maxsize=1)
 def get_config():
-    """Load configuration from config.yaml file."""
+    """Load configuration from config.yaml file.
+    
+    The parsed config is cached for the whole process and shared by all
+    workflow instances; call get_config.cache_clear() after config.yaml changes.
+    """
     try:
         config_path = get_resource_path("config.yaml")
         with open(config_path, 'r', encoding='utf-8') as f:
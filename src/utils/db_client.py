@@ -153,6 +153,8 @@ class DatabaseConnection:
         self.connection = sqlite3.connect(db_file_path, timeout=30.0)
         # Enable WAL mode for better concurrent access
         self.connection.execute("PRAGMA journal_mode=WAL")
+        # In WAL mode NORMAL only syncs at checkpoints, not on every commit
+        self.connection.execute("PRAGMA synchronous=NORMAL")
         # Set busy timeout
         self.connection.execute("PRAGMA busy_timeout=30000")
         self.cursor = self.connection.cursor()
@@ -286,4 +288,44 @@ def initialize_sent_messages_table():
             
     except Exception as e:
         logger.error(f"Error initializing sent messages table: {str(e)}")
-        return False
\ No newline at end of file
+        return False
+
+def initialize_query_embeddings_table():
+    """
+    Initialize the query_embeddings table which persists generated text embeddings per model.
+    This table is not reset when other tables are reset.
+    """
+    try:
+        # Use a longer timeout for initialization
+        db_file_path = get_db_path()
+        conn = sqlite3.connect(db_file_path, timeout=60.0)
+        
+        try:
+            # Enable WAL mode for better concurrent access
+            conn.execute("PRAGMA journal_mode=WAL")
+            # Set busy timeout
+            conn.execute("PRAGMA busy_timeout=60000")
+            cursor = conn.cursor()
+            
+            # Create embeddings cache table; embeddings are raw float32 bytes
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS query_embeddings (
+                model TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                embedding BLOB NOT NULL,
+                PRIMARY KEY (model, text_hash)
+            )
+            """)
+            
+            conn.commit()
+            cursor.close()
+            
+            logger.info(f"Query embeddings table initialized at {get_db_path()}")
+            return True
+            
+        finally:
+            conn.close()
+            
+    except Exception as e:
+        logger.error(f"Error initializing query embeddings table: {str(e)}")
+        return False
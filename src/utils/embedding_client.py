@@ -3,6 +3,7 @@ import os
 import chromadb
 from chromadb.config import Settings
 import threading
+from collections import Counter, OrderedDict
 from pathlib import Path
 from typing import Dict, Any, List, Optional, Tuple, Literal
 import numpy as np
@@ -11,14 +12,25 @@ from .resource_path import get_resource_path, get_app_data_dir, is_bundled
 # Configure logging
 logger = logging.getLogger(__name__)
 
-# Global ChromaDB variables
+# Global ChromaDB variables; the client and collection are published together as one tuple
+# so readers never see a client paired with a collection from an earlier initialization
 _chroma_client = None
+_chroma_handles = None
 _chroma_initialized = False
 _chroma_init_lock = threading.Lock()
 
 # Collection name for unified embedding database
 EMBEDDING_COLLECTION_NAME = "unified_embeddings"
 
+# HNSW index settings applied when the collection is created; ChromaDB cannot change
+# them for an existing collection, which keeps whatever it was created with
+COLLECTION_METADATA = {
+    "hnsw:space": "cosine",
+    "hnsw:M": 32,
+    "hnsw:construction_ef": 40,
+    "hnsw:search_ef": 16,
+}
+
 # Embedding types
 EMBEDDING_TYPES = ["caption", "transcript"]
 
@@ -29,6 +41,24 @@ CAPTION_SUBTYPES = ["ad", "non-ad"]
 # Default embedding type
 DEFAULT_EMBEDDING_TYPE = "caption"
 
+# Rows per collection.add call; each call is written in a single transaction, and keeping
+# it below ChromaDB's max batch size avoids rejected adds and caps WAL growth
+ADD_BATCH_SIZE = 5000
+
+# Rows fetched per collection.get call when scanning the whole collection
+SCAN_PAGE_SIZE = 10000
+
+# In-memory copy of the collection for document-only similarity searches, published as one
+# (buffer, count, documents, metadatas, row_masks) tuple; None until loaded or after a failed
+# write. Rows past count are spare capacity, so saves append without copying the matrix.
+# Every write bumps the generation under the lock, so a load racing with a write is not published.
+_embedding_snapshot = None
+_snapshot_generation = 0
+_snapshot_lock = threading.Lock()
+
+# Filtered row sets kept per snapshot, most recently used last
+SNAPSHOT_FILTER_CACHE_SIZE = 32
+
 def get_chroma_path():
     """Get the ChromaDB storage path, initializing it if necessary.
     
@@ -55,7 +85,7 @@ def initialize_embedding_client(force_reset=False):
     Returns:
         bool: True if initialization was successful, False otherwise
     """
-    global _chroma_client, _chroma_initialized
+    global _chroma_client, _chroma_handles, _chroma_initialized
     
     try:
         chroma_path = get_chroma_path()
@@ -72,6 +102,7 @@ def initialize_embedding_client(force_reset=False):
         if force_reset:
             logger.info("Force reset enabled. Resetting ChromaDB collections...")
             _chroma_client.reset()
+            invalidate_embedding_snapshot()
         
         # Create or get the unified collection
         try:
@@ -80,10 +111,12 @@ def initialize_embedding_client(force_reset=False):
         except:
             collection = _chroma_client.create_collection(
                 name=EMBEDDING_COLLECTION_NAME,
-                metadata={"hnsw:space": "cosine"}
+                metadata=COLLECTION_METADATA
             )
             logger.info(f"Created new ChromaDB collection: {EMBEDDING_COLLECTION_NAME}")
         
+        # Keep the collection handle so operations don't look it up every time
+        _chroma_handles = (_chroma_client, collection)
         _chroma_initialized = True
         logger.info(f"Embedding client initialized at {chroma_path}")
         return True
@@ -101,8 +134,7 @@ class EmbeddingConnection:
     def __enter__(self):
         # Ensure ChromaDB is initialized
         ensure_embedding_initialized()
-        self.client = _chroma_client
-        self.collection = self.client.get_collection(name=EMBEDDING_COLLECTION_NAME)
+        self.client, self.collection = _chroma_handles
         return self.client, self.collection
 
     def __exit__(self, exc_type, exc_val, exc_tb):
@@ -110,6 +142,153 @@ class EmbeddingConnection:
         if exc_type is not None:
             logger.error(f"Embedding operation failed: {exc_val}")
 
+def iter_collection_metadatas(collection, page_size: int = SCAN_PAGE_SIZE):
+    """Yield the metadata of every entry in the collection, fetched one page at a time
+    so large collections are never materialized in memory at once."""
+    offset = 0
+    while True:
+        page = collection.get(include=["metadatas"], limit=page_size, offset=offset)
+        yield from page["metadatas"]
+        if len(page["metadatas"]) < page_size:
+            break
+        offset += page_size
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """Scale each row to unit length in place, leaving all-zero rows as they are."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    matrix /= np.where(norms == 0, 1, norms)
+    return matrix
+
+def load_embedding_snapshot() -> bool:
+    """Load every embedding into memory as a row-normalized float32 matrix, so similarity
+    searches can run as one matrix product instead of a ChromaDB query.
+    
+    Returns:
+        bool: True if the snapshot was loaded, False otherwise
+    """
+    global _embedding_snapshot
+    generation = _snapshot_generation
+    try:
+        with get_embedding_context() as (client, collection):
+            rows, documents, metadatas = [], [], []
+            offset = 0
+            while True:
+                page = collection.get(include=["embeddings", "metadatas", "documents"],
+                                      limit=SCAN_PAGE_SIZE, offset=offset)
+                if len(page["ids"]):
+                    rows.append(np.asarray(page["embeddings"], dtype=np.float32))
+                documents.extend(page["documents"])
+                metadatas.extend(page["metadatas"])
+                if len(page["ids"]) < SCAN_PAGE_SIZE:
+                    break
+                offset += SCAN_PAGE_SIZE
+        
+        if not rows:
+            return False
+        
+        matrix = _normalize_rows(np.concatenate(rows))
+        # Publish only if no write happened since the scan started
+        with _snapshot_lock:
+            if generation != _snapshot_generation:
+                return False
+            _embedding_snapshot = (matrix, len(documents), documents, metadatas, OrderedDict())
+        logger.info(f"Loaded embedding snapshot with {len(documents)} entries")
+        return True
+    except Exception as e:
+        logger.error(f"Error loading embedding snapshot: {str(e)}")
+        return False
+
+def invalidate_embedding_snapshot():
+    """Drop the in-memory snapshot after the collection changes; searches use ChromaDB until it is reloaded."""
+    global _embedding_snapshot, _snapshot_generation
+    with _snapshot_lock:
+        _snapshot_generation += 1
+        _embedding_snapshot = None
+
+def _extend_embedding_snapshot(embeddings: np.ndarray, documents: List[str], metadatas: List[Dict[str, Any]]):
+    """Append rows just saved to the collection to the in-memory snapshot, if one is loaded."""
+    global _embedding_snapshot, _snapshot_generation
+    rows = _normalize_rows(np.array(embeddings, dtype=np.float32))
+    with _snapshot_lock:
+        _snapshot_generation += 1
+        if _embedding_snapshot is None:
+            return
+        buffer, count, snapshot_documents, snapshot_metadatas, _ = _embedding_snapshot
+        if rows.shape[1] != buffer.shape[1]:
+            _embedding_snapshot = None
+            return
+        if count + len(rows) > len(buffer):
+            # Grow geometrically so a long ingest copies the matrix only a few times
+            grown = np.empty((max(2 * len(buffer), count + len(rows)), buffer.shape[1]), dtype=np.float32)
+            grown[:count] = buffer[:count]
+            buffer = grown
+        # Rows past count are not visible to searches holding the previous snapshot
+        buffer[count:count + len(rows)] = rows
+        del snapshot_documents[count:], snapshot_metadatas[count:]
+        snapshot_documents.extend(documents)
+        snapshot_metadatas.extend(metadatas)
+        _embedding_snapshot = (buffer, count + len(rows), snapshot_documents, snapshot_metadatas, OrderedDict())
+
+def _snapshot_rows(snapshot, embedding_type: str, tag_filters: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+    """Indices of the snapshot rows matching the type and tag filters, or None when a filter
+    uses an operator other than equality or $in and has to be left to ChromaDB."""
+    _, count, _, metadatas, row_masks = snapshot
+    conditions = [("embedding_type", embedding_type)] + sorted((tag_filters or {}).items())
+    key = repr(conditions)
+    with _snapshot_lock:
+        rows = row_masks.get(key)
+        if rows is not None:
+            row_masks.move_to_end(key)
+            return rows
+    
+    checks = []
+    for field, value in conditions:
+        if isinstance(value, dict):
+            if list(value) != ["$in"]:
+                return None
+            allowed = value["$in"]
+            checks.append(lambda meta, field=field, allowed=allowed: meta.get(field) in allowed)
+        else:
+            checks.append(lambda meta, field=field, value=value: meta.get(field) == value)
+    
+    rows = np.fromiter(
+        (i for i, meta in enumerate(metadatas[:count]) if meta and all(check(meta) for check in checks)),
+        dtype=np.intp
+    )
+    with _snapshot_lock:
+        row_masks[key] = rows
+        if len(row_masks) > SNAPSHOT_FILTER_CACHE_SIZE:
+            row_masks.popitem(last=False)
+    return rows
+
+def _search_snapshot(query_embeddings: np.ndarray, embedding_type: str,
+                     tag_filters: Optional[Dict[str, Any]], n_results: int) -> Optional[List[List[str]]]:
+    """Documents nearest to each query by cosine similarity, found in the in-memory snapshot.
+    Returns None when no snapshot is loaded or the filters cannot be applied to it."""
+    snapshot = _embedding_snapshot
+    if snapshot is None:
+        return None
+    rows = _snapshot_rows(snapshot, embedding_type, tag_filters)
+    if rows is None:
+        return None
+    
+    k = min(n_results, len(rows))
+    if k <= 0:
+        return [[] for _ in range(len(query_embeddings))]
+    
+    matrix, count, documents, _, _ = snapshot
+    norms = np.linalg.norm(query_embeddings, axis=1, keepdims=True)
+    queries = query_embeddings / np.where(norms == 0, 1, norms)
+    # One product against the whole matrix (a view, so nothing is copied), then keep the
+    # filtered columns and take the top k of each row without a full sort
+    scores = (queries @ matrix[:count].T)[:, rows]
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    results = []
+    for query_scores, candidates in zip(scores, top):
+        ordered = candidates[np.argsort(-query_scores[candidates])]
+        results.append([documents[rows[i]] for i in ordered])
+    return results
+
 def get_embedding_context():
     """Get an embedding context manager - similar to get_db_context()"""
     return EmbeddingConnection()
@@ -118,6 +297,10 @@ def ensure_embedding_initialized(force_reset=False):
     """Ensure ChromaDB client is initialized - similar to ensure_db_initialized()"""
     global _chroma_initialized
     
+    # Fast path once initialized, without taking the lock on every operation
+    if _chroma_initialized and not force_reset:
+        return
+    
     # Use a lock to prevent concurrent initialization
     with _chroma_init_lock:
         if force_reset:
@@ -148,7 +331,7 @@ def save_embeddings_batch(embeddings_data: List[Dict[str, Any]], embedding_type:
     """Save multiple embeddings to the unified database.
     
     Args:
-        embeddings_data: List of dicts with keys: id, embedding, metadata, document
+        embeddings_data: List of dicts with keys: id, embedding (float32 np.ndarray), metadata, document
         embedding_type: Type of embedding ("caption" or "transcript")
         
     Returns:
@@ -164,9 +347,12 @@ def save_embeddings_batch(embeddings_data: List[Dict[str, Any]], embedding_type:
     
     try:
         with get_embedding_context() as (client, collection):
-            # Extract data for batch insert
+            # Extract data for batch insert; embeddings are copied straight into one preallocated
+            # float32 matrix rather than passed as lists of Python floats
             ids = [item["id"] for item in embeddings_data]
-            embeddings = [item["embedding"] for item in embeddings_data]
+            embeddings = np.empty((len(embeddings_data), len(embeddings_data[0]["embedding"])), dtype=np.float32)
+            for row, item in zip(embeddings, embeddings_data):
+                row[:] = item["embedding"]
             metadatas = [item["metadata"] for item in embeddings_data]
             documents = [item["document"] for item in embeddings_data]
             
@@ -174,18 +360,25 @@ def save_embeddings_batch(embeddings_data: List[Dict[str, Any]], embedding_type:
             for metadata in metadatas:
                 metadata["embedding_type"] = embedding_type
             
-            collection.add(
-                ids=ids,
-                embeddings=embeddings,
-                metadatas=metadatas,
-                documents=documents
-            )
+            for start in range(0, len(ids), ADD_BATCH_SIZE):
+                end = start + ADD_BATCH_SIZE
+                collection.add(
+                    ids=ids[start:end],
+                    embeddings=embeddings[start:end],
+                    metadatas=metadatas[start:end],
+                    documents=documents[start:end]
+                )
             
             logger.info(f"Saved {len(embeddings_data)} {embedding_type} embeddings to unified collection")
-            return True
+        
+        # Updated only once the write is over, so a snapshot loaded during it is discarded
+        _extend_embedding_snapshot(embeddings, documents, metadatas)
+        return True
             
     except Exception as e:
         logger.error(f"Error saving embeddings batch: {str(e)}")
+        # Some slices may have been added; searches go back to ChromaDB until a reload
+        invalidate_embedding_snapshot()
         return False
 
 def search_similar_embeddings(
@@ -205,9 +398,47 @@ def search_similar_embeddings(
     Returns:
         List[Dict[str, Any]]: Search results with metadata and documents
     """
+    return search_similar_embeddings_batch(
+        query_embeddings=np.asarray(query_embedding, dtype=np.float32).reshape(1, -1),
+        embedding_type=embedding_type,
+        tag_filters=tag_filters,
+        n_results=n_results
+    )[0]
+
+def search_similar_embeddings_batch(
+    query_embeddings: np.ndarray,
+    embedding_type: str,
+    tag_filters: Optional[Dict[str, Any]] = None,
+    n_results: int = 5,
+    documents_only: bool = False
+) -> List[List[Any]]:
+    """Search for embeddings similar to each of several queries in a single ChromaDB query.
+    
+    Args:
+        query_embeddings: Matrix with one query embedding per row
+        embedding_type: Type of embedding to search ("caption" or "transcript")
+        tag_filters: Optional additional metadata filters
+        n_results: Number of results to return per query
+        documents_only: Return only the document texts, skipping metadata and distances
+        
+    Returns:
+        List[List[Any]]: Search results with metadata and documents (or just the documents), one list per query
+    """
+    query_embeddings = np.asarray(query_embeddings, dtype=np.float32)
+    empty_results = [[] for _ in range(len(query_embeddings))]
+    
     if embedding_type not in EMBEDDING_TYPES:
         logger.warning(f"Invalid embedding type: {embedding_type}. Must be one of {EMBEDDING_TYPES}")
-        return []
+        return empty_results
+    
+    if not len(query_embeddings):
+        return empty_results
+    
+    # Document-only searches are answered from the in-memory snapshot when it is current
+    if documents_only:
+        snapshot_results = _search_snapshot(query_embeddings, embedding_type, tag_filters, n_results)
+        if snapshot_results is not None:
+            return snapshot_results
     
     try:
         with get_embedding_context() as (client, collection):
@@ -227,30 +458,36 @@ def search_similar_embeddings(
             
             logger.debug(f"ChromaDB where filter: {where_filter}")
             
-            # Query ChromaDB
+            # Query ChromaDB with all queries at once
             results = collection.query(
-                query_embeddings=[query_embedding.tolist()],
+                query_embeddings=query_embeddings,
                 n_results=min(n_results, collection.count()),
                 where=where_filter,
-                include=["metadatas", "documents", "distances"]
+                include=["documents"] if documents_only else ["metadatas", "documents", "distances"]
             )
             
-            # Format results
+            # ChromaDB already returns the documents grouped per query
+            if documents_only:
+                return results["documents"]
+            
+            # Format results per query
+            distances_per_query = results["distances"] or [None] * len(results["documents"])
             formatted_results = []
-            if results["documents"] and results["documents"][0]:
-                for i in range(len(results["documents"][0])):
-                    result = {
-                        "document": results["documents"][0][i],
-                        "metadata": results["metadatas"][0][i],
-                        "distance": results["distances"][0][i] if results["distances"] else None
+            for documents, metadatas, distances in zip(results["documents"], results["metadatas"], distances_per_query):
+                formatted_results.append([
+                    {
+                        "document": document,
+                        "metadata": metadata,
+                        "distance": distances[i] if distances else None
                     }
-                    formatted_results.append(result)
+                    for i, (document, metadata) in enumerate(zip(documents, metadatas))
+                ])
             
             return formatted_results
             
     except Exception as e:
         logger.error(f"Error searching embeddings: {str(e)}")
-        return []
+        return empty_results
 
 def get_collection_stats() -> Dict[str, Any]:
     """Get statistics about the unified embedding collection."""
@@ -263,31 +500,24 @@ def get_collection_stats() -> Dict[str, Any]:
             
             # Get embedding type and label distribution
             try:
-                all_data = collection.get(include=["metadatas"])
-                
-                # Track embedding type distribution
-                type_counts = {}
-                for metadata in all_data["metadatas"]:
-                    embedding_type = metadata.get("embedding_type", "unknown")
-                    type_counts[embedding_type] = type_counts.get(embedding_type, 0) + 1
-                stats["embedding_type_distribution"] = type_counts
+                # Count each (embedding type, label) pair once, then derive every distribution from that
+                pair_counts = Counter(
+                    (metadata.get("embedding_type", "unknown"), metadata.get("label", "unknown"))
+                    for metadata in iter_collection_metadatas(collection)
+                )
                 
-                # Track label distribution
-                label_counts = {}
-                caption_subtype_counts = {}
+                type_counts = Counter()
+                label_counts = Counter()
+                caption_subtype_counts = Counter()
+                for (embedding_type, label), count in pair_counts.items():
+                    type_counts[embedding_type] += count
+                    label_counts[label] += count
+                    if embedding_type == "caption":
+                        caption_subtype_counts[label] += count
                 
-                for metadata in all_data["metadatas"]:
-                    # Overall label counts
-                    label = metadata.get("label", "unknown")
-                    label_counts[label] = label_counts.get(label, 0) + 1
-                    
-                    # Caption subtype counts
-                    if metadata.get("embedding_type") == "caption":
-                        caption_type = metadata.get("label", "unknown")
-                        caption_subtype_counts[caption_type] = caption_subtype_counts.get(caption_type, 0) + 1
-                
-                stats["label_distribution"] = label_counts
-                stats["caption_subtype_distribution"] = caption_subtype_counts
+                stats["embedding_type_distribution"] = dict(type_counts)
+                stats["label_distribution"] = dict(label_counts)
+                stats["caption_subtype_distribution"] = dict(caption_subtype_counts)
                 
             except Exception as e:
                 logger.warning(f"Could not get distribution statistics: {str(e)}")
@@ -337,6 +567,7 @@ def delete_embeddings_by_filter(
             
             if ids_to_delete:
                 collection.delete(ids=ids_to_delete)
+                invalidate_embedding_snapshot()
                 logger.info(f"Deleted {len(ids_to_delete)} embeddings")
                 return len(ids_to_delete)
             
@@ -383,12 +614,9 @@ def search_similar_transcripts(
 def load_all_text_hashes():
     try:
         with get_embedding_context() as (client, collection):
-            results = collection.get(
-                include=["metadatas"],
-            )
             # Collect both caption_hash and transcript_hash values
             hashes = set()
-            for meta in results["metadatas"]:
+            for meta in iter_collection_metadatas(collection):
                 if "caption_hash" in meta:
                     hashes.add(meta.get("caption_hash"))
                 if "transcript_hash" in meta: